@@ -9,214 +9,529 @@ JSON exports are written automatically under `Material Outputs/<blend-stem>/`
 next to this launcher/read_blend.py script.
 """
 
+import atexit
+import json
 import os
+import re
 import subprocess
+import tempfile
+from collections import deque
 from pathlib import Path
 
 MATERIAL_OUTPUTS_DIRNAME = "Material Outputs"
+PYTHON_SEARCH_MAX_DEPTH = 8
+_VERSION_DIR_RE = re.compile(r"\d+\.\d+$")
+# Folders that never lead to python\bin\python.exe; the fallback walk skips them.
+_PRUNE_DIR_NAMES = frozenset({
+    "datafiles", "scripts", "doc", "docs", "shared", "license", "licenses",
+    "locale", "fonts", "lib", "include", "__pycache__", ".git",
+})
+# Skip pip's PyPI self-version check and never block on a prompt (no TTY here)
+PIP_QUIET_FLAGS = ["--disable-pip-version-check", "--no-input"]
+# Dialogs only show the last ~2000 chars, so only the tail of a child's log is kept
+OUTPUT_TAIL_LINES = 200
+
+# Resolved once at import; main() and the subprocess helpers reuse these.
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_READER_SCRIPT = _SCRIPT_DIR / "read_blend.py"
+_ENV_BASE = os.environ.copy()
+_USER_PACKAGES_DIR = Path(os.environ.get("LOCALAPPDATA", str(Path.home()))) / "BlenderPyPackages"
+_BAT_CACHE_PATH = _USER_PACKAGES_DIR / "launcher_cache.json"
+
+# Console children of this GUI launcher shouldn't flash/spin up a conhost window.
+_SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+
+def _hidden_startupinfo():
+    if os.name != "nt":
+        return None
+    si = subprocess.STARTUPINFO()
+    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    si.wShowWindow = subprocess.SW_HIDE
+    return si
 
 # --- GUI helpers (Windows) ---
-def _tk():
-    import tkinter as tk
-    from tkinter import filedialog, messagebox
-    
-    root = tk.Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-    return root, filedialog, messagebox
-
-def ask_blender_dir():
-    root, filedialog, _ = _tk()
-    d = filedialog.askdirectory(title="Select your Blender install folder (the one containing blender.exe)")
-    root.destroy()
-    return Path(d) if d else None
-
+_TK_MODULES = None
+_ROOT = None
+
+def _load_tk():
+    """Import tkinter on first use only; later calls return the cached modules."""
+    global _TK_MODULES
+    if _TK_MODULES is None:
+        import tkinter as tk
+        from tkinter import filedialog, messagebox
+        _TK_MODULES = (tk, filedialog, messagebox)
+    return _TK_MODULES
+
+def _get_root():
+    """One hidden, topmost Tk root shared by every dialog; destroyed at exit."""
+    global _ROOT
+    if _ROOT is None:
+        tk, _, _ = _load_tk()
+        _ROOT = tk.Tk()
+        _ROOT.withdraw()
+        _ROOT.attributes("-topmost", True)
+        atexit.register(_destroy_root)
+    return _ROOT
+
+def _destroy_root():
+    global _ROOT
+    if _ROOT is not None:
+        _ROOT.destroy()
+        _ROOT = None
+
+def ask_blender_dir():
+    _, filedialog, _ = _load_tk()
+    d = filedialog.askdirectory(
+        parent=_get_root(),
+        title="Select your Blender install folder (the one containing blender.exe)",
+    )
+    return Path(d) if d else None
+
 def ask_blend_file():
-    root, filedialog, _ = _tk()
+    _, filedialog, _ = _load_tk()
     f = filedialog.askopenfilename(
+        parent=_get_root(),
         title="SELECT A .blend FILE",
-        filetypes=[("Blender files", "*.blend"), ("All files", "*.*")]
-    )
-    root.destroy()
+        filetypes=[("Blender files", "*.blend"), ("All files", "*.*")]
+    )
     return Path(f) if f else None
-
-def ask_yes_no(title, msg):
-    root, _, messagebox = _tk()
-    ans = messagebox.askyesno(title, msg)
-    root.destroy()
-    return ans
-
-def show_info(title, msg):
-    root, _, messagebox = _tk()
-    messagebox.showinfo(title, msg)
-    root.destroy()
-
+
+def ask_yes_no(title, msg):
+    _, _, messagebox = _load_tk()
+    return messagebox.askyesno(title, msg, parent=_get_root())
+
+def show_info(title, msg):
+    _, _, messagebox = _load_tk()
+    messagebox.showinfo(title, msg, parent=_get_root())
+
 def show_error(title, msg):
-    root, _, messagebox = _tk()
-    messagebox.showerror(title, msg)
-    root.destroy()
-
-
-# --- Blender python discovery ---
-def find_blender_python(blender_dir: Path) -> Path | None:
-    """
-    Expect user selects folder containing blender.exe OR a parent folder.
-    This tries common Blender layouts:
-      <dir>\blender.exe
-      <dir>\<version>\python\bin\python.exe
-      <dir>\python\bin\python.exe   (portable builds)
-    """
-    blender_dir = blender_dir.resolve()
-
-    # If they picked the exact folder with blender.exe
-    if (blender_dir / "blender.exe").exists():
-        # Try: <dir>\<ver>\python\bin\python.exe
-        for sub in blender_dir.iterdir():
-            cand = sub / "python" / "bin" / "python.exe"
-            if cand.exists():
-                return cand
-        # Try: <dir>\python\bin\python.exe
-        cand = blender_dir / "python" / "bin" / "python.exe"
-        if cand.exists():
-            return cand
-
-    # Search around for python.exe 
-    for p in blender_dir.rglob("python.exe"):
-        parts = [x.lower() for x in p.parts]
-        try:
-            i = parts.index("python")
-            if i + 2 < len(parts) and parts[i + 1] == "bin" and p.name.lower() == "python.exe":
-                # Depth guard
-                rel_depth = len(p.relative_to(blender_dir).parts)
-                if rel_depth <= 8:
-                    return p
-        except ValueError:
-            pass
-
-    return None
-
-
-# --- BAT detection / installation ---
-def run_python(python_exe: Path, args: list[str], env: dict | None = None) -> subprocess.CompletedProcess:
-    cmd = [str(python_exe), *args]
-    return subprocess.run(cmd, capture_output=True, text=True, env=env)
-
-def has_bat(python_exe: Path, extra_pythonpath: Path | None = None) -> bool:
-    env = os.environ.copy()
-    if extra_pythonpath:
-        env["PYTHONPATH"] = str(extra_pythonpath) + os.pathsep + env.get("PYTHONPATH", "")
-    cp = run_python(python_exe, ["-c", "import blender_asset_tracer; print('OK')"], env=env)
-    return cp.returncode == 0
-
-def install_bat(python_exe: Path, target_dir: Path | None = None) -> tuple[bool, str]:
-    """
-    Attempts:
-      - ensurepip (if needed)
-      - pip install blender-asset-tracer
-    If target_dir is provided, uses --target <dir> (no admin rights required).
-    Returns (success, combined_output).
-    """
-    outputs = []
-
-    # Ensure pip exists
-    cp = run_python(python_exe, ["-m", "pip", "--version"])
-    if cp.returncode != 0:
-        cp2 = run_python(python_exe, ["-m", "ensurepip", "--upgrade"])
-        outputs.append(cp2.stdout + cp2.stderr)
-        # try pip again
-        cp = run_python(python_exe, ["-m", "pip", "--version"])
-        outputs.append(cp.stdout + cp.stderr)
-        if cp.returncode != 0:
-            return False, "\n".join(outputs)
-
-    # Upgrade pip (optional but helps)
-    cp3 = run_python(python_exe, ["-m", "pip", "install", "--upgrade", "pip"])
-    outputs.append(cp3.stdout + cp3.stderr)
-
-    install_cmd = ["-m", "pip", "install", "--upgrade", "blender-asset-tracer"]
-    if target_dir:
-        target_dir.mkdir(parents=True, exist_ok=True)
-        install_cmd += ["--target", str(target_dir)]
-
-    cp4 = run_python(python_exe, install_cmd)
-    outputs.append(cp4.stdout + cp4.stderr)
-
-    return cp4.returncode == 0, "\n".join(outputs)
-
-
+    _, _, messagebox = _load_tk()
+    messagebox.showerror(title, msg, parent=_get_root())
+
+
+# --- Blender python discovery ---
+def find_blender_python(blender_dir: Path) -> Path | None:
+    """
+    Expect user selects folder containing blender.exe OR a parent folder.
+    This tries common Blender layouts:
+      <dir>\blender.exe
+      <dir>\<version>\python\bin\python.exe
+      <dir>\python\bin\python.exe   (portable builds)
+    """
+    blender_dir = blender_dir.resolve()
+    root = str(blender_dir)
+
+    # Try: <dir>\<ver>\python\bin\python.exe (only "X.Y" folders are probed)
+    cand = _probe_version_dirs(root)
+    if cand:
+        return Path(cand)
+
+    # Try: <dir>\python\bin\python.exe
+    cand = os.path.join(root, "python", "bin", "python.exe")
+    if os.path.exists(cand):
+        return Path(cand)
+
+    # Search around for python.exe (e.g. a parent folder was picked)
+    for exe_path in _walk_python_exes(blender_dir):
+        bin_dir, bin_name = os.path.split(os.path.dirname(exe_path))
+        if bin_name.lower() == "bin" and os.path.basename(bin_dir).lower() == "python":
+            return Path(exe_path)
+
+    return None
+
+
+def _probe_version_dirs(root: str) -> str | None:
+    """
+    Check <dir>\<X.Y>\python\bin\python.exe for each version folder.
+    One directory read plus one stat per installed version; works on plain
+    strings so no Path objects are built per candidate.
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if not _VERSION_DIR_RE.match(entry.name) or not entry.is_dir():
+                    continue
+                cand = os.path.join(entry.path, "python", "bin", "python.exe")
+                if os.path.exists(cand):
+                    return cand
+    except OSError:
+        pass
+    return None
+
+
+# FindFirstFileExW constants (FindExInfoBasic skips 8.3 short names,
+# FIND_FIRST_EX_LARGE_FETCH uses a bigger directory read buffer).
+_FIND_EX_INFO_BASIC = 1
+_FIND_EX_SEARCH_NAME_MATCH = 0
+_FIND_FIRST_EX_LARGE_FETCH = 2
+_FILE_ATTRIBUTE_DIRECTORY = 0x10
+_FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+_ERROR_NO_MORE_FILES = 18
+_KERNEL32 = None
+
+def _kernel32():
+    global _KERNEL32
+    if _KERNEL32 is None:
+        import ctypes
+        from ctypes import wintypes
+
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        k32.FindFirstFileExW.argtypes = [
+            wintypes.LPCWSTR, ctypes.c_int, ctypes.POINTER(wintypes.WIN32_FIND_DATAW),
+            ctypes.c_int, ctypes.c_void_p, wintypes.DWORD,
+        ]
+        k32.FindFirstFileExW.restype = wintypes.HANDLE
+        k32.FindNextFileW.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.WIN32_FIND_DATAW)]
+        k32.FindNextFileW.restype = wintypes.BOOL
+        k32.FindClose.argtypes = [wintypes.HANDLE]
+        k32.FindClose.restype = wintypes.BOOL
+        _KERNEL32 = (ctypes, wintypes, k32)
+    return _KERNEL32
+
+def _win_iterdir(dir_path: str):
+    """
+    Yield (name, is_dir) for dir_path via FindFirstFileExW(FindExInfoBasic,
+    FIND_FIRST_EX_LARGE_FETCH). Reparse points are reported as files, which
+    matches is_dir(follow_symlinks=False). Raises OSError like os.scandir.
+    """
+    ctypes, wintypes, k32 = _kernel32()
+    data = wintypes.WIN32_FIND_DATAW()
+    handle = k32.FindFirstFileExW(
+        os.path.join(dir_path, "*"),
+        _FIND_EX_INFO_BASIC,
+        ctypes.byref(data),
+        _FIND_EX_SEARCH_NAME_MATCH,
+        None,
+        _FIND_FIRST_EX_LARGE_FETCH,
+    )
+    if handle is None or handle == ctypes.c_void_p(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        while True:
+            name = data.cFileName
+            if name not in (".", ".."):
+                attrs = data.dwFileAttributes
+                is_dir = bool(attrs & _FILE_ATTRIBUTE_DIRECTORY) and not (attrs & _FILE_ATTRIBUTE_REPARSE_POINT)
+                yield name, is_dir
+            if not k32.FindNextFileW(handle, ctypes.byref(data)):
+                err = ctypes.get_last_error()
+                if err != _ERROR_NO_MORE_FILES:
+                    raise ctypes.WinError(err)
+                break
+    finally:
+        k32.FindClose(handle)
+
+def _scandir_iterdir(dir_path: str):
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            try:
+                yield entry.name, entry.is_dir(follow_symlinks=False)
+            except OSError:
+                pass
+
+def _iterdir(dir_path: str, fast_windows: bool):
+    # Fall back to os.scandir only if the fast path fails before yielding;
+    # rescanning after a partial listing would report entries twice.
+    if fast_windows:
+        yielded = False
+        try:
+            for entry in _win_iterdir(dir_path):
+                yielded = True
+                yield entry
+            return
+        except (OSError, AttributeError, ImportError):
+            if yielded:
+                raise
+    yield from _scandir_iterdir(dir_path)
+
+
+def _walk_python_exes(root: Path, max_depth: int = PYTHON_SEARCH_MAX_DEPTH):
+    """
+    Yield python.exe paths (str) under root, breadth-first, never descending
+    past max_depth. Depth travels with each queued directory, so nothing
+    below the limit is ever read. Above a version folder ("4.2") any
+    directory except _PRUNE_DIR_NAMES is entered; inside it only python\bin
+    is followed, so datafiles/scripts/python\lib are skipped.
+    On local Windows drives the listing uses FindFirstFileExW directly.
+    """
+    root_str = str(root)
+    fast_windows = os.name == "nt" and not root_str.startswith("\\\\")
+    queue = deque([(root_str, 0, None)])
+    while queue:
+        dir_path, depth, expect = queue.popleft()
+        try:
+            for entry_name, is_dir in _iterdir(dir_path, fast_windows):
+                name = entry_name.lower()
+                if is_dir:
+                    if depth + 1 >= max_depth:
+                        continue
+                    entry_path = os.path.join(dir_path, entry_name)
+                    if expect is None:
+                        if name in _PRUNE_DIR_NAMES:
+                            continue
+                        if _VERSION_DIR_RE.match(name):
+                            queue.append((entry_path, depth + 1, "python"))
+                        elif name == "python":
+                            queue.append((entry_path, depth + 1, "bin"))
+                        else:
+                            queue.append((entry_path, depth + 1, None))
+                    elif name == expect:
+                        queue.append((entry_path, depth + 1, "bin" if expect == "python" else ""))
+                elif name == "python.exe" and expect == "":
+                    yield os.path.join(dir_path, entry_name)
+        except OSError:
+            pass
+
+
+# --- BAT detection / installation ---
+_ENV_BY_EXTRA_PATH: dict[str, dict] = {}
+
+def python_env(extra_pythonpath: Path | None = None) -> dict:
+    """
+    Environment for Blender-Python children. Without an extra path this is
+    _ENV_BASE itself (subprocess never mutates env); otherwise one dict per
+    extra path is built and shared, so has_bat and the reader run reuse it.
+    Callers must not modify the returned dict.
+    """
+    if not extra_pythonpath:
+        return _ENV_BASE
+    key = str(extra_pythonpath)
+    env = _ENV_BY_EXTRA_PATH.get(key)
+    if env is None:
+        env = {**_ENV_BASE, "PYTHONPATH": key + os.pathsep + _ENV_BASE.get("PYTHONPATH", "")}
+        _ENV_BY_EXTRA_PATH[key] = env
+    return env
+
+def run_python(python_exe: Path, args: list[str], env: dict | None = None) -> subprocess.CompletedProcess:
+    """
+    Run Blender's python, streaming stdout+stderr line by line and keeping
+    only the last OUTPUT_TAIL_LINES lines (pip logs can be huge).
+    The tail is returned as .stdout; .stderr is always "".
+    """
+    cmd = [str(python_exe), *args]
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        env=env,
+        creationflags=_SUBPROCESS_FLAGS,
+        startupinfo=_hidden_startupinfo(),
+    ) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+        returncode = proc.wait()
+    return subprocess.CompletedProcess(cmd, returncode, stdout="".join(tail), stderr="")
+
+def blender_site_packages(python_exe: Path) -> Path | None:
+    """
+    <ver>\python\bin\python.exe -> <ver>\python\lib\site-packages
+    (Blender's embedded layout on Windows). None if that folder is missing.
+    """
+    site_packages = python_exe.parent.parent / "lib" / "site-packages"
+    return site_packages if site_packages.is_dir() else None
+
+def _dir_writable(path: Path) -> bool:
+    """
+    os.access() plus a real temp-file write: on Windows os.access ignores
+    ACLs, so Program Files can look writable when it is not.
+    """
+    if not os.access(path, os.W_OK):
+        return False
+    try:
+        with tempfile.NamedTemporaryFile(dir=path, prefix=".bat_write_test_", delete=True):
+            pass
+    except OSError:
+        return False
+    return True
+
+def _bat_on_disk(python_exe: Path, extra_pythonpath: Path | None = None) -> bool:
+    """Cheap stat-only check for blender_asset_tracer/__init__.py."""
+    search_dirs = [blender_site_packages(python_exe), extra_pythonpath]
+    for d in search_dirs:
+        if d and os.path.isfile(os.path.join(d, "blender_asset_tracer", "__init__.py")):
+            return True
+    return False
+
+# Only looks up the .dist-info on sys.path; BAT itself is never imported.
+_BAT_METADATA_PROBE = """
+import importlib.metadata, sys
+try:
+    importlib.metadata.distribution("blender-asset-tracer")
+except importlib.metadata.PackageNotFoundError:
+    sys.exit(1)
+"""
+
+def has_bat(python_exe: Path, extra_pythonpath: Path | None = None) -> bool:
+    # Found on disk: no need to boot Blender's Python just to import it.
+    # Otherwise ask the interpreter, which also sees user-site/PYTHONPATH installs.
+    if _bat_on_disk(python_exe, extra_pythonpath):
+        return True
+    env = python_env(extra_pythonpath)
+    cp = run_python(python_exe, ["-c", _BAT_METADATA_PROBE], env=env)
+    return cp.returncode == 0
+
+# --- BAT presence cache (skips has_bat on repeat runs) ---
+def _mtime_ns(path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+def _bat_cache_stamp(python_exe: Path, extra_pythonpath: Path | None) -> dict:
+    return {
+        "blender_py_mtime": _mtime_ns(python_exe),
+        "site_packages_mtime": _mtime_ns(blender_site_packages(python_exe)),
+        "extra_path": str(extra_pythonpath) if extra_pythonpath else None,
+        "extra_path_mtime": _mtime_ns(extra_pythonpath),
+    }
+
+def _load_bat_cache() -> dict:
+    try:
+        data = json.loads(_BAT_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def cached_bat_location(python_exe: Path) -> tuple[bool, Path | None]:
+    """
+    (True, extra_path) if a previous run verified BAT for this interpreter and
+    neither python.exe, site-packages nor the extra path changed since.
+    """
+    entry = _load_bat_cache().get(str(python_exe))
+    if not isinstance(entry, dict) or not entry.get("bat_ok"):
+        return False, None
+    extra_path = Path(entry["extra_path"]) if entry.get("extra_path") else None
+    stamp = _bat_cache_stamp(python_exe, extra_path)
+    if any(entry.get(key) != value for key, value in stamp.items()):
+        return False, None
+    return True, extra_path
+
+def save_bat_cache(python_exe: Path, extra_pythonpath: Path | None) -> None:
+    cache = _load_bat_cache()
+    cache[str(python_exe)] = {**_bat_cache_stamp(python_exe, extra_pythonpath), "bat_ok": True}
+    try:
+        _BAT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _BAT_CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    except OSError:
+        pass
+
+
+# Runs inside Blender's Python: ensure pip, install BAT, then import it, all in
+# one interpreter start. argv[1] is the optional --target directory.
+_BAT_BOOTSTRAP = """
+import importlib, subprocess, sys
+try:
+    import pip
+except ImportError:
+    import ensurepip
+    ensurepip.bootstrap(upgrade=True)
+target = sys.argv[1] if len(sys.argv) > 1 else ""
+cmd = [sys.executable, "-m", "pip", %s, "install", "--upgrade", "blender-asset-tracer"]
+if target:
+    cmd += ["--target", target]
+    sys.path.insert(0, target)
+subprocess.check_call(cmd)
+importlib.invalidate_caches()
+import blender_asset_tracer
+print("BAT_OK")
+""" % ", ".join(repr(flag) for flag in PIP_QUIET_FLAGS)
+
+def install_bat(python_exe: Path, target_dir: Path | None = None) -> tuple[bool, str]:
+    """
+    Single Blender-Python run that:
+      - bootstraps pip via ensurepip (if needed)
+      - pip installs blender-asset-tracer
+      - imports it to verify the install
+    If target_dir is provided, uses --target <dir> (no admin rights required).
+    Returns (success, combined_output).
+    """
+    args = ["-c", _BAT_BOOTSTRAP]
+    if target_dir:
+        target_dir.mkdir(parents=True, exist_ok=True)
+        args.append(str(target_dir))
+
+    cp = run_python(python_exe, args)
+    ok = cp.returncode == 0 and cp.stdout.rstrip().endswith("BAT_OK")
+    return ok, cp.stdout
+
+
 def main():
     blender_dir = ask_blender_dir()
     if not blender_dir:
         return
-
-    blender_py = find_blender_python(blender_dir)
-    if not blender_py or not blender_py.exists():
-        show_error("Blender Python not found",
-                   "Couldn't locate Blender's embedded python.exe.\n\n"
-                   "Make sure you selected the folder that contains blender.exe (or a portable Blender folder).")
-        return
-
-    # Check if BAT is available (normal import)
-    extra_path = None
-    if not has_bat(blender_py):
-        # Ask to install
-        if not ask_yes_no("BAT not found",
-                          "blender_asset_tracer (BAT) is not available in Blender's Python.\n\n"
-                          "Do you want to install it now?"):
-            show_info("Cancelled", "BAT was not installed.")
-            return
-
-        # Try normal install first (may fail under Program Files)
-        ok, log = install_bat(blender_py, target_dir=None)
-        if not ok:
-            # 3) Fallback: install to user-writable target directory
-            fallback = Path(os.environ.get("LOCALAPPDATA", str(Path.home()))) / "BlenderPyPackages" / "BAT"
-            ok2, log2 = install_bat(blender_py, target_dir=fallback)
-            if not ok2:
-                show_error("Install failed",
-                           "Tried installing BAT but it failed.\n\n"
-                           "Normal install output:\n" + log[-1500:] + "\n\n"
-                           "Fallback --target install output:\n" + log2[-1500:])
-                return
-            extra_path = fallback
-
-        # Verify after install
-        if not has_bat(blender_py, extra_pythonpath=extra_path):
-            show_error("Install issue",
-                       "BAT install seemed to complete, but import still fails.\n"
-                       "This usually means Python can't see the install location.")
-            return
-
+
+    blender_py = find_blender_python(blender_dir)
+    if not blender_py or not blender_py.exists():
+        show_error("Blender Python not found",
+                   "Couldn't locate Blender's embedded python.exe.\n\n"
+                   "Make sure you selected the folder that contains blender.exe (or a portable Blender folder).")
+        return
+
+    # Check if BAT is available (cached from an earlier run, else normal import)
+    bat_cached, extra_path = cached_bat_location(blender_py)
+    if not bat_cached and not has_bat(blender_py):
+        # Ask to install
+        if not ask_yes_no("BAT not found",
+                          "blender_asset_tracer (BAT) is not available in Blender's Python.\n\n"
+                          "Do you want to install it now?"):
+            show_info("Cancelled", "BAT was not installed.")
+            return
+
+        # Pick the install location up front instead of letting a doomed
+        # site-packages install (typical under Program Files) fail first.
+        site_packages = blender_site_packages(blender_py)
+        if site_packages and _dir_writable(site_packages):
+            target_dir = None
+            location = str(site_packages)
+        else:
+            target_dir = _USER_PACKAGES_DIR / "BAT"
+            location = f"{target_dir} (--target; Blender's site-packages is not writable)"
+        ok, log = install_bat(blender_py, target_dir=target_dir)
+        if not ok:
+            show_error("Install failed",
+                       "Tried installing BAT but it failed.\n\n"
+                       f"Install location:\n{location}\n\n"
+                       "Install output:\n" + log[-3000:])
+            return
+        extra_path = target_dir
+
+        # Verify after install
+        if not has_bat(blender_py, extra_pythonpath=extra_path):
+            show_error("Install issue",
+                       "BAT install seemed to complete, but import still fails.\n"
+                       "This usually means Python can't see the install location.")
+            return
+
+    if not bat_cached:
+        save_bat_cache(blender_py, extra_path)
+
     # Choose the .blend file; output JSON is determined automatically.
     blend_path = ask_blend_file()
     if not blend_path:
         return
 
-    script_dir = Path(__file__).resolve().parent
-    out_dir = script_dir / MATERIAL_OUTPUTS_DIRNAME / blend_path.stem
+    out_dir = _SCRIPT_DIR / MATERIAL_OUTPUTS_DIRNAME / blend_path.stem
     out_name = f"{blend_path.stem}.json"
     out_json = out_dir / out_name
-
-    # Run the reader script using Blender's python
-    reader_script = Path(__file__).with_name("read_blend.py")
-    if not reader_script.exists():
-        show_error("Missing script", f"Couldn't find {reader_script.name} next to the launcher script.")
-        return
-
-    env = os.environ.copy()
-    if extra_path:
-        env["PYTHONPATH"] = str(extra_path) + os.pathsep + env.get("PYTHONPATH", "")
-
-    cp = subprocess.run(
-        [str(blender_py), str(reader_script), str(blend_path), out_json.name],
-        capture_output=True, text=True, env=env
-    )
-
+
+    # Run the reader script using Blender's python
+    reader_script = _READER_SCRIPT
+    if not reader_script.exists():
+        show_error("Missing script", f"Couldn't find {reader_script.name} next to the launcher script.")
+        return
+
+    env = python_env(extra_path)
+
+    cp = run_python(blender_py, [str(reader_script), str(blend_path), out_json.name, "--graphs"], env=env)
+
     if cp.returncode != 0:
-        show_error("Reader failed", (cp.stderr or cp.stdout or "Unknown error")[-2000:])
+        show_error("Reader failed", (cp.stdout or "Unknown error")[-2000:])
         return
 
     show_info("Done", f"Saved JSON:\n{out_json}\n\nOutput:\n{(cp.stdout or '').strip()[:1200]}")
-
-if __name__ == "__main__":
-    main()
+
+if __name__ == "__main__":
+    main()
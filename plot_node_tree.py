@@ -12,13 +12,34 @@ especially for Blender-only, non-glTF features that should be preserved.
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import math
 import textwrap
 from pathlib import Path
+from typing import Iterator
 
 MATERIAL_OUTPUTS_DIRNAME = "Material Outputs"
 DEFAULT_NODE_WIDTH = 140.0
 DEFAULT_NODE_HEIGHT = 100.0
+OUTPUT_FORMATS = ("png", "svg", "pdf")
+# Agg refuses canvases of 2**16 px or more per side and gets very memory
+# hungry well before that, so oversized rasters fall back to SVG.
+AGG_MAX_SIDE_PX = 2**16
+AGG_MAX_AREA_PX = 2**30
+
+# Serialized socket values, keyed by (type, value) for hashable scalars and by
+# id() for everything else; only valid while one _build_detail_meta pass runs.
+_DUMPS_CACHE: dict[object, str] = {}
+# json.dumps builds a fresh JSONEncoder whenever it gets non-default options.
+_DETAIL_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_DUMPS_SCALAR_TYPES = (str, int, bool, float, type(None))
+# One TextWrapper per detail-text inner width, shared by every node.
+_WRAPPER_CACHE: dict[int, textwrap.TextWrapper] = {}
+# Shared detail metadata for nodes without detail text (never mutated).
+_EMPTY_DETAIL_META: dict[str, object] = {"draw_lines": [], "draw_text": "", "line_count": 0, "max_chars": 0}
+# Stand-in for missing link endpoint dicts (never mutated).
+_EMPTY_REF: dict = {}
 
 
 def _material_outputs_dir(blend_stem: str) -> Path:
@@ -56,6 +77,45 @@ def _clean_output_filename(name: str, *, default_suffix: str | None = None) -> s
     return out_path.name
 
 
+def _output_format(out_name: str, requested: str | None) -> str:
+    """
+    Decide which image format to save.
+
+    An explicit --format wins; otherwise the --out suffix picks the format, so
+    graph.svg keeps working without the flag.
+
+    inputs:
+        out_name: Requested output filename.
+        requested: Value of --format, or None.
+    returns:
+        One of OUTPUT_FORMATS.
+    """
+    if requested:
+        return requested
+    suffix = Path(out_name).suffix.lower().lstrip(".")
+    return suffix if suffix in OUTPUT_FORMATS else "png"
+
+
+def _raster_too_large(fig, dpi: float) -> bool:
+    """
+    Check whether saving the figure as a raster would exceed Agg's limits.
+
+    inputs:
+        fig: Matplotlib figure about to be saved.
+        dpi: Output DPI.
+    returns:
+        True if a PNG of this figure would be too large for Agg.
+    """
+    width_in, height_in = fig.get_size_inches()
+    width_px = width_in * dpi
+    height_px = height_in * dpi
+    return (
+        width_px >= AGG_MAX_SIDE_PX
+        or height_px >= AGG_MAX_SIDE_PX
+        or width_px * height_px > AGG_MAX_AREA_PX
+    )
+
+
 def _blend_stem_from_export(data: dict, json_path: Path) -> str:
     """
     Best-effort lookup of the source .blend stem for an exported JSON document.
@@ -83,6 +143,35 @@ def _blend_stem_from_export(data: dict, json_path: Path) -> str:
     return stem or "Blend"
 
 
+def _load_export(json_path: Path) -> dict:
+    """
+    Parse an exported JSON document straight from its bytes.
+
+    orjson is optional and used when installed. The exporter writes with
+    the json module, which can emit NaN/Infinity literals that orjson rejects,
+    so those documents fall back to the standard parser. Gzip-compressed
+    exports (.json.gz) are detected by their magic bytes.
+
+    inputs:
+        json_path: Path to the JSON file written by read_blend.py.
+    returns:
+        Parsed JSON dict.
+    """
+    raw = json_path.read_bytes()
+    if raw[:2] == b"\x1f\x8b":
+        import gzip
+
+        raw = gzip.decompress(raw)
+    try:
+        import orjson
+    except ModuleNotFoundError:
+        return json.loads(raw)
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+
 def _pick_material(data: dict, material_name: str | None) -> dict:
     """
     Select a material entry to plot from an exported JSON document.
@@ -133,6 +222,21 @@ def _node_title(node: dict) -> str:
     return (node.get("idname") or "<node>").strip()
 
 
+def _display_title(node: dict) -> str:
+    """
+    Return a node's title shortened to fit inside its rectangle.
+
+    inputs:
+        node: Serialized node dict.
+    returns:
+        The node title, cut to 35 characters plus "..." when longer than 38.
+    """
+    title = _node_title(node)
+    if len(title) > 38:
+        title = title[:35] + "..."
+    return title
+
+
 def _node_geometry(node: dict) -> tuple[float, float, float, float]:
     """
     Read a node's position and size with fallback defaults.
@@ -141,34 +245,82 @@ def _node_geometry(node: dict) -> tuple[float, float, float, float]:
     which helps when debugging how a graph should translate into Godot material
     properties.
 
+    The result is memoized on the node under "_geom" together with the loc
+    object it was read from. Layout passes replace node["loc"] with a new list
+    rather than editing it, so an identity check is enough to spot stale data.
+
     inputs:
         node: Serialized node dict.
     returns:
         Tuple (x, y_top, width, height) in data coordinates.
     """
-    x, y_top = node.get("loc") or (0.0, 0.0)
+    loc = node.get("loc")
+    cached = node.get("_geom")
+    if cached is not None and cached[0] is loc:
+        return cached[1]
+    x, y_top = loc or (0.0, 0.0)
     width = float(node.get("width") or DEFAULT_NODE_WIDTH)
     height = float(node.get("height") or DEFAULT_NODE_HEIGHT)
-    return float(x), float(y_top), width, height
+    geometry = (float(x), float(y_top), width, height)
+    node["_geom"] = (loc, geometry)
+    return geometry
+
+
+def _set_node_top(node: dict, y_top: float) -> None:
+    """
+    Move a node's top edge, leaving its loc untouched when nothing changed.
+
+    Keeping the same loc object for nodes a layout pass did not move keeps the
+    _node_geometry memo valid across the repeated canvas-fit passes.
+
+    inputs:
+        node: Serialized node dict (mutated in-place via loc).
+        y_top: New top y in data coordinates.
+    returns:
+        None.
+    """
+    x, old_top, _, _ = _node_geometry(node)
+    if y_top != old_top:
+        node["loc"] = [x, y_top]
+
+
+def _all_node_geometries(nodes: list[dict]):
+    """
+    Read every node's geometry into one array.
+
+    inputs:
+        nodes: Serialized node dicts.
+    returns:
+        (N, 4) float64 array of (x, y_top, width, height), aligned with nodes.
+    """
+    import numpy as np
+
+    return np.array([_node_geometry(node) for node in nodes], dtype=np.float64).reshape(-1, 4)
 
 
-def _layout_sort_key(node: dict) -> tuple[float, float]:
+def _layout_order(nodes: list[dict]):
     """
-    Provide a stable top-to-bottom, left-to-right layout sort key.
+    Order nodes top-to-bottom, left-to-right for the collision solvers.
 
     A deterministic ordering makes plots (and diffs) more predictable while
-    iterating on extraction and a Godot conversion step.
+    iterating on extraction and a Godot conversion step. Geometry is read once
+    and sorted with a stable np.lexsort on (-y_top, x), so ties keep their
+    input order exactly like sorted() did.
 
     inputs:
-        node: Serialized node dict.
+        nodes: Serialized node dicts.
     returns:
-        Sort key tuple (-y_top, x).
+        Tuple (order, geometry): node positions in layout order, and an (N, 4)
+        float64 array of (x, y_top, width, height) rows in that same order.
     """
-    x, y_top, _, _ = _node_geometry(node)
-    return (-y_top, x)
+    import numpy as np
+
+    geometry = _all_node_geometries(nodes)
+    order = np.lexsort((geometry[:, 0], -geometry[:, 1]))
+    return order.tolist(), geometry[order]
 
 
-def _compute_socket_positions(node: dict, side: str) -> dict[int, tuple[float, float]]:
+def _iter_node_sockets(node: dict) -> Iterator[tuple[int, tuple[float, float]]]:
     """
     Compute approximate socket anchor positions for drawing link arrows.
 
@@ -178,35 +330,24 @@ def _compute_socket_positions(node: dict, side: str) -> dict[int, tuple[float, f
 
     inputs:
         node: Serialized node dict.
-        side: Either `"inputs"` or `"outputs"`.
     returns:
-        Mapping of socket ptr -> (x, y) position in data coordinates.
+        Iterator of (socket ptr, (x, y)) pairs in data coordinates, covering
+        inputs (left edge) and outputs (right edge).
     """
     x, y_top, width, height = _node_geometry(node)
 
-    if side == "inputs":
-        sockets = node.get("inputs") or []
-        sx = float(x)
-    else:
-        sockets = node.get("outputs") or []
-        sx = float(x) + width
-
-    socket_count = len(sockets)
-    if socket_count == 0:
-        return {}
-
     margin = min(30.0, max(12.0, height * 0.12))
     inner = max(1.0, height - 2.0 * margin)
-    step = inner / float(socket_count + 1)
 
-    positions: dict[int, tuple[float, float]] = {}
-    for index, socket in enumerate(sockets):
-        ptr = socket.get("ptr")
-        if not ptr:
+    for sockets, sx in ((node.get("inputs") or [], x), (node.get("outputs") or [], x + width)):
+        if not sockets:
             continue
-        sy = float(y_top) - margin - float(index + 1) * step
-        positions[int(ptr)] = (sx, sy)
-    return positions
+        step = inner / float(len(sockets) + 1)
+        for index, socket in enumerate(sockets):
+            ptr = socket.get("ptr")
+            if not ptr:
+                continue
+            yield int(ptr), (sx, y_top - margin - float(index + 1) * step)
 
 
 def _socket_detail_entries(node: dict) -> list[tuple[str, dict]]:
@@ -244,6 +385,31 @@ def _escape_mpl_text(text: str) -> str:
     return text.replace("$", r"\$")
 
 
+def _dumps_cached(value: object) -> str:
+    """
+    json.dumps a socket value, reusing earlier output for repeated values.
+
+    Socket defaults repeat heavily across a material (identical type names,
+    link flags, colors), so most detail-text serialization is redundant.
+
+    inputs:
+        value: JSON-serializable socket field value.
+    returns:
+        JSON text (ensure_ascii=False).
+    """
+    value_type = type(value)
+    if value_type in _DUMPS_SCALAR_TYPES and not (value_type is float and value == 0.0):
+        # -0.0 == 0.0 but they serialize differently, so zeros skip the cache.
+        key = (value_type, value)
+    else:
+        key = id(value)
+    text = _DUMPS_CACHE.get(key)
+    if text is None:
+        text = _DETAIL_ENCODER.encode(value)
+        _DUMPS_CACHE[key] = text
+    return text
+
+
 def _detail_text_block(node: dict, wrap_width: int) -> dict[str, object]:
     """
     Format per-node socket JSON into wrapped text lines for plotting.
@@ -256,13 +422,22 @@ def _detail_text_block(node: dict, wrap_width: int) -> dict[str, object]:
         node: Serialized node dict.
         wrap_width: Approximate character width before wrapping.
     returns:
-        Dict with draw_lines (strings), plus line_count and max_chars for layout.
+        Dict with draw_lines (strings) and their pre-joined draw_text, plus
+        line_count and max_chars for layout.
     """
     draw_lines: list[str] = []
     plain_lines: list[str] = []
 
     payload_width = max(24, int(wrap_width))
     inner_width = max(16, payload_width - 2)
+    wrapper = _WRAPPER_CACHE.get(inner_width)
+    if wrapper is None:
+        wrapper = textwrap.TextWrapper(
+            width=inner_width,
+            break_long_words=False,
+            break_on_hyphens=False,
+        )
+        _WRAPPER_CACHE[inner_width] = wrapper
 
     for kind, payload in _socket_detail_entries(node):
         draw_lines.append(rf"$\bf{{{kind}:}}$ " + _escape_mpl_text("{"))
@@ -270,16 +445,11 @@ def _detail_text_block(node: dict, wrap_width: int) -> dict[str, object]:
 
         items = list(payload.items()) if isinstance(payload, dict) else []
         for idx, (key, value) in enumerate(items):
-            value_json = json.dumps(value, ensure_ascii=False)
+            value_json = _dumps_cached(value)
             pair_text = f'"{key}": {value_json}'
             if idx < len(items) - 1:
                 pair_text += ","
-            wrapped = textwrap.wrap(
-                pair_text,
-                width=inner_width,
-                break_long_words=False,
-                break_on_hyphens=False,
-            ) or [pair_text]
+            wrapped = wrapper.wrap(pair_text) or [pair_text]
             for line in wrapped:
                 draw_lines.append(_escape_mpl_text("  " + line))
                 plain_lines.append("  " + line)
@@ -289,6 +459,7 @@ def _detail_text_block(node: dict, wrap_width: int) -> dict[str, object]:
 
     return {
         "draw_lines": draw_lines,
+        "draw_text": "\n".join(draw_lines),
         "line_count": len(draw_lines),
         "max_chars": max((len(line) for line in plain_lines), default=0),
     }
@@ -308,6 +479,8 @@ def _detail_size_estimate(meta: dict[str, object], line_height: float, char_widt
     returns:
         Tuple (detail_width, detail_height) in data units.
     """
+    if meta is _EMPTY_DETAIL_META:
+        return 0.0, 0.0
     line_count = int(meta.get("line_count") or 0)
     max_chars = int(meta.get("max_chars") or 0)
     detail_height = (line_count * line_height + 8.0) if line_count > 0 else 0.0
@@ -403,6 +576,28 @@ def _merge_boxes(
     )
 
 
+def _shift_box_y(
+    box: tuple[float, float, float, float] | None,
+    dy: float,
+) -> tuple[float, float, float, float] | None:
+    """
+    Translate a box vertically.
+
+    The collision solvers only ever move a node straight down, so its boxes
+    keep their size and can be shifted instead of rebuilt.
+
+    inputs:
+        box: Box (left, right, bottom, top), or None.
+        dy: Vertical offset to add.
+    returns:
+        Shifted box, or None if box is None.
+    """
+    if box is None:
+        return None
+    left, right, bottom, top = box
+    return (left, right, bottom + dy, top + dy)
+
+
 def _boxes_overlap(
     box_a: tuple[float, float, float, float],
     box_b: tuple[float, float, float, float],
@@ -434,139 +629,182 @@ def _boxes_overlap(
     return True
 
 
-def _placement_conflicts(
-    candidate_node: tuple[float, float, float, float],
-    candidate_detail: tuple[float, float, float, float] | None,
-    placed: list[dict[str, tuple[float, float, float, float] | None]],
-    node_pad: float,
-    detail_pad: float,
-) -> bool:
+def _boxes_overlap_rows(boxes, box: tuple[float, float, float, float], pad: float):
     """
-    Determine if a candidate placement collides with any placed boxes.
+    Vectorized _boxes_overlap of one box against every row of an (N, 4) array.
 
-    The auto-layout uses this to keep nodes and their detail text from overlapping,
-    so the extracted socket defaults and identifiers remain readable.
+    Rows filled with NaN (placed nodes without detail text) never overlap,
+    since every comparison against NaN is False.
 
     inputs:
-        candidate_node: Node rectangle bounds (display coords).
-        candidate_detail: Optional detail-text bounds (display coords).
-        placed: List of dicts with node and detail boxes for already-placed nodes.
-        node_pad: Padding for node collisions.
-        detail_pad: Padding for detail-text collisions.
+        boxes: NumPy array of (left, right, bottom, top) rows.
+        box: Box to test (left, right, bottom, top).
+        pad: Extra spacing treated as part of each box.
     returns:
-        True if placement conflicts, else False.
+        Boolean NumPy mask, True where the row overlaps box.
     """
-    for other in placed:
-        other_node = other["node"]
-        other_detail = other["detail"]
-
-        if _boxes_overlap(candidate_node, other_node, node_pad):
-            return True
-        if candidate_detail is not None and other_detail is not None:
-            if _boxes_overlap(candidate_detail, other_detail, detail_pad):
-                return True
-        if candidate_detail is not None:
-            if _boxes_overlap(candidate_detail, other_node, node_pad):
-                return True
-        if other_detail is not None:
-            if _boxes_overlap(candidate_node, other_detail, node_pad):
-                return True
-    return False
+    left, right, bottom, top = box
+    return (
+        (boxes[:, 1] + pad >= left)
+        & (boxes[:, 0] <= right + pad)
+        & (boxes[:, 3] + pad >= bottom)
+        & (boxes[:, 2] <= top + pad)
+    )
 
 
-def _node_box_display(
-    ax,
-    x: float,
-    y_top: float,
-    node_width: float,
-    node_height: float,
-) -> tuple[float, float, float, float]:
+class _PlacedBoxGrid:
     """
-    Compute node rectangle bounds in display (pixel) coordinates.
-
-    We switch to display space when measuring text extents so collision detection
-    matches what will actually be rendered on the plot.
-
-    inputs:
-        ax: Matplotlib axes.
-        x: Node left x (data coords).
-        y_top: Node top y (data coords).
-        node_width: Rectangle width (data coords).
-        node_height: Rectangle height (data coords).
-    returns:
-        Bounding box tuple (left, right, bottom, top) in pixels.
-    """
-    p_a = ax.transData.transform((x, y_top))
-    p_b = ax.transData.transform((x + node_width, y_top - node_height))
-    left = min(p_a[0], p_b[0])
-    right = max(p_a[0], p_b[0])
-    bottom = min(p_a[1], p_b[1])
-    top = max(p_a[1], p_b[1])
-    return (left, right, bottom, top)
-
-
-def _detail_box_display(
-    ax,
-    x: float,
-    y_top: float,
-    node_height: float,
-    detail_gap_y: float,
-    detail_offset_x: float,
-    detail_size: tuple[float, float],
-) -> tuple[float, float, float, float] | None:
+    Uniform-grid spatial index over already-placed node/detail boxes.
+
+    The collision solvers used to test every candidate against every placed
+    node, which is quadratic in node count. Bucketing each placed union box
+    into fixed-size cells means a candidate is only compared against the few
+    boxes sharing a cell with it, while the overlap rules stay exactly the same.
+    Placed boxes are kept as (N, 4) NumPy rows so the boxes a candidate shares
+    cells with are tested in one vectorized pass.
     """
-    Compute detail-text bounds in display (pixel) coordinates.
 
-    Text extents are measured in pixels, so we compute collisions in display space
-    and then convert back to data coordinates for axis sizing.
+    def __init__(self, bucket_w: float, bucket_h: float, capacity: int = 64) -> None:
+        """
+        inputs:
+            bucket_w: Cell width in the solver's coordinate space.
+            bucket_h: Cell height in the solver's coordinate space.
+            capacity: Initial row capacity (doubled on overflow).
+        """
+        # numpy ships with matplotlib, which main() imports before any layout.
+        import numpy as np
+
+        self.bucket_w = bucket_w
+        self.bucket_h = bucket_h
+        self.node_arr = np.empty((capacity, 4), dtype=np.float64)
+        self.detail_arr = np.empty((capacity, 4), dtype=np.float64)
+        self.n_placed = 0
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
+    def _cell_range(self, box: tuple[float, float, float, float], pad: float):
+        left, right, bottom, top = box
+        x0 = int((left - pad) // self.bucket_w)
+        x1 = int((right + pad) // self.bucket_w)
+        y0 = int((bottom - pad) // self.bucket_h)
+        y1 = int((top + pad) // self.bucket_h)
+        for ix in range(x0, x1 + 1):
+            for iy in range(y0, y1 + 1):
+                yield ix, iy
+
+    def _grow(self) -> None:
+        import numpy as np
+
+        capacity = 2 * len(self.node_arr)
+        node_arr = np.empty((capacity, 4), dtype=np.float64)
+        detail_arr = np.empty((capacity, 4), dtype=np.float64)
+        node_arr[: self.n_placed] = self.node_arr[: self.n_placed]
+        detail_arr[: self.n_placed] = self.detail_arr[: self.n_placed]
+        self.node_arr = node_arr
+        self.detail_arr = detail_arr
+
+    def add(
+        self,
+        node_box: tuple[float, float, float, float],
+        detail_box: tuple[float, float, float, float] | None,
+    ) -> None:
+        """
+        Record a placed node (and its optional detail text) in the grid.
+
+        inputs:
+            node_box: Node rectangle bounds.
+            detail_box: Optional detail-text bounds.
+        returns:
+            None.
+        """
+        index = self.n_placed
+        if index == len(self.node_arr):
+            self._grow()
+        self.node_arr[index] = node_box
+        self.detail_arr[index] = detail_box if detail_box is not None else float("nan")
+        self.n_placed = index + 1
+        for cell in self._cell_range(_merge_boxes(node_box, detail_box), 0.0):
+            self.cells.setdefault(cell, []).append(index)
+
+    def conflict_bottom(
+        self,
+        candidate_node: tuple[float, float, float, float],
+        candidate_detail: tuple[float, float, float, float] | None,
+        node_pad: float,
+        detail_pad: float,
+    ) -> float | None:
+        """
+        Find the lowest placed box that a candidate placement collides with.
+
+        The auto-layout uses this to keep nodes and their detail text from
+        overlapping, so the extracted socket defaults and identifiers remain
+        readable. Returning the lowest conflicting bottom edge (instead of a
+        plain bool) lets the solver jump straight past the conflict.
+
+        inputs:
+            candidate_node: Node rectangle bounds.
+            candidate_detail: Optional detail-text bounds.
+            node_pad: Padding for node collisions.
+            detail_pad: Padding for detail-text collisions.
+        returns:
+            Minimum bottom coordinate across the conflicting placed boxes, or
+            None if the placement is free.
+        """
+        query_box = _merge_boxes(candidate_node, candidate_detail)
+        pad = max(node_pad, detail_pad)
+        cells = self.cells
+        nearby: set[int] = set()
+        for cell in self._cell_range(query_box, pad):
+            nearby.update(cells.get(cell, ()))
+        if not nearby:
+            return None
+
+        rows = list(nearby)
+        other_nodes = self.node_arr[rows]
+        other_details = self.detail_arr[rows]
+
+        node_hits = _boxes_overlap_rows(other_nodes, candidate_node, node_pad)
+        detail_hits = _boxes_overlap_rows(other_details, candidate_node, node_pad)
+        if candidate_detail is not None:
+            detail_hits |= _boxes_overlap_rows(other_details, candidate_detail, detail_pad)
+            node_hits |= _boxes_overlap_rows(other_nodes, candidate_detail, node_pad)
 
-    inputs:
-        ax: Matplotlib axes.
-        x: Node left x (data coords).
-        y_top: Node top y (data coords).
-        node_height: Node height (data coords).
-        detail_gap_y: Gap under node (data coords).
-        detail_offset_x: X offset under node (data coords).
-        detail_size: (width_px, height_px) measured from a text bbox.
-    returns:
-        Bounding box tuple in pixels, or None if size is empty.
-    """
-    width_px, height_px = detail_size
-    if width_px <= 0.0 or height_px <= 0.0:
-        return None
-    anchor = ax.transData.transform((x + detail_offset_x, y_top - node_height - detail_gap_y))
-    left = float(anchor[0])
-    top = float(anchor[1])
-    right = left + float(width_px)
-    bottom = top - float(height_px)
-    return (left, right, bottom, top)
+        bottom = None
+        if node_hits.any():
+            bottom = float(other_nodes[node_hits, 2].min())
+        if detail_hits.any():
+            detail_bottom = float(other_details[detail_hits, 2].min())
+            bottom = detail_bottom if bottom is None else min(bottom, detail_bottom)
+        return bottom
 
 
-def _display_box_to_data(
-    ax,
-    display_box: tuple[float, float, float, float],
-) -> tuple[float, float, float, float]:
-    """Convert a display-space (pixel) box into data coordinates.
+def _display_boxes_to_data(
+    inv,
+    display_boxes: list[tuple[float, float, float, float]],
+):
+    """Convert display-space (pixel) boxes into data coordinates.
 
     The final collision pass runs in pixel space (matching matplotlib text
     measurement), but the rest of the plot uses data coordinates for layout and
-    axis limits.
+    axis limits. All corners go through one inverse-transform call.
 
     inputs:
-        ax: Matplotlib axes.
-        display_box: (left, right, bottom, top) in pixels.
+        inv: Inverted ax.transData transform.
+        display_boxes: (left, right, bottom, top) boxes in pixels.
     returns:
-        Bounding box tuple in data coordinates.
+        (N, 4) float64 array of (left, right, bottom, top) rows in data
+        coordinates, in input order.
     """
-    inv = ax.transData.inverted()
-    left, right, bottom, top = display_box
-    p_lb = inv.transform((left, bottom))
-    p_rt = inv.transform((right, top))
-    x_min = min(p_lb[0], p_rt[0])
-    x_max = max(p_lb[0], p_rt[0])
-    y_min = min(p_lb[1], p_rt[1])
-    y_max = max(p_lb[1], p_rt[1])
-    return (x_min, x_max, y_min, y_max)
+    import numpy as np
+
+    if not display_boxes:
+        return np.empty((0, 4), dtype=np.float64)
+    corners = inv.transform(
+        [corner for left, right, bottom, top in display_boxes for corner in ((left, bottom), (right, top))]
+    ).reshape(-1, 4)
+    x_a, y_a, x_b, y_b = corners.T
+    return np.column_stack(
+        (np.minimum(x_a, x_b), np.maximum(x_a, x_b), np.minimum(y_a, y_b), np.maximum(y_a, y_b))
+    )
 
 
 def _layout_boxes_data(
@@ -624,7 +862,8 @@ def _layout_boxes_display(
     Build node/detail/union boxes in display (pixel) coordinates.
 
     Display-space boxes let the layout solver account for actual text measurement,
-    which is important when validating extracted socket metadata.
+    which is important when validating extracted socket metadata. The two node
+    corners and the detail-text anchor go through one transData.transform call.
 
     inputs:
         ax: Matplotlib axes.
@@ -638,59 +877,52 @@ def _layout_boxes_display(
     returns:
         Tuple (node_box, detail_box, union_box) in display coordinates.
     """
-    node_box = _node_box_display(ax, x, y_top, node_width, node_height)
-    detail_box = _detail_box_display(
-        ax,
-        x,
-        y_top,
-        node_height,
-        detail_gap_y,
-        detail_offset_x,
-        detail_size,
+    (ax_px, ay_px), (bx_px, by_px), (anchor_x, anchor_y) = ax.transData.transform(
+        [
+            (x, y_top),
+            (x + node_width, y_top - node_height),
+            (x + detail_offset_x, y_top - node_height - detail_gap_y),
+        ]
     )
+    node_box = (min(ax_px, bx_px), max(ax_px, bx_px), min(ay_px, by_px), max(ay_px, by_px))
+
+    width_px, height_px = detail_size
+    if width_px <= 0.0 or height_px <= 0.0:
+        return node_box, None, node_box
+    left = float(anchor_x)
+    top = float(anchor_y)
+    detail_box = (left, left + float(width_px), top - float(height_px), top)
     return node_box, detail_box, _merge_boxes(node_box, detail_box)
 
 
-def _auto_space_nodes_display(
-    ax,
-    nodes: list[dict],
-    detail_meta: dict[int, dict[str, object]],
-    detail_font_size: float,
-    detail_gap_y: float,
-    detail_offset_x: float,
-) -> dict[int, tuple[float, float, float, float]]:
-    """Resolve node collisions using measured text extents in display space.
+def _measure_detail_sizes(ax, detail_meta: list[dict[str, object]], detail_font_size: float):
+    """
+    Measure every detail-text block in display pixels.
 
-    This is the "final" reflow step: it uses the matplotlib renderer to measure
-    actual detail-text boxes, then shifts nodes until the plot is readable. That
-    readability is the point of this tool: it should be easy to see what
-    read_blend.py extracted before mapping it into Godot materials.
+    Pixel extents depend on the figure DPI but not on its size, so the canvas
+    fit measures once and reuses the result for every layout pass.
 
     inputs:
-        ax: Matplotlib axes used for transforms and text measurement.
-        nodes: List of node dicts (mutated in-place via loc).
-        detail_meta: Per-node detail text metadata (draw_lines/line_count/etc).
+        ax: Matplotlib axes whose figure renderer is used for measurement.
+        detail_meta: Per-node detail text metadata, aligned with nodes.
         detail_font_size: Font size used for detail text.
-        detail_gap_y: Vertical gap between node and detail text (data coords).
-        detail_offset_x: Horizontal offset for detail text (data coords).
     returns:
-        Mapping of id(node_dict) -> union bounding box in data coordinates.
+        (N, 2) float64 array of (width, height) in pixels, aligned with nodes;
+        zero rows for nodes without detail text.
     """
-    fig = ax.figure
-    fig.canvas.draw()
-    renderer = fig.canvas.get_renderer()
+    import numpy as np
 
-    detail_sizes: dict[int, tuple[float, float]] = {}
-    probes: list[tuple[int, object]] = []
-    for node in nodes:
-        lines = detail_meta.get(id(node), {}).get("draw_lines") or []
-        if not lines:
-            detail_sizes[id(node)] = (0.0, 0.0)
-            continue
-        probe_text = ax.text(
+    renderer = ax.figure.canvas.get_renderer()
+
+    # One reusable probe measured straight through the renderer: text extents
+    # do not depend on a fresh canvas draw.
+    detail_sizes = np.zeros((len(detail_meta), 2), dtype=np.float64)
+    detail_texts = [(index, meta["draw_text"]) for index, meta in enumerate(detail_meta) if meta["draw_text"]]
+    if detail_texts:
+        probe = ax.text(
             0.0,
             0.0,
-            "\n".join(lines),
+            "",
             ha="left",
             va="top",
             fontsize=detail_font_size,
@@ -699,37 +931,64 @@ def _auto_space_nodes_display(
             alpha=0.0,
             clip_on=False,
         )
-        probes.append((id(node), probe_text))
-
-    if probes:
-        fig.canvas.draw()
-        renderer = fig.canvas.get_renderer()
-    for node_id, probe in probes:
-        bbox = probe.get_window_extent(renderer=renderer)
-        detail_sizes[node_id] = (float(bbox.width), float(bbox.height))
+        for index, text in detail_texts:
+            probe.set_text(text)
+            bbox = probe.get_window_extent(renderer=renderer)
+            detail_sizes[index] = (bbox.width, bbox.height)
         probe.remove()
+    return detail_sizes
+
+
+def _auto_space_nodes_display(
+    ax,
+    nodes: list[dict],
+    detail_sizes,
+    detail_gap_y: float,
+    detail_offset_x: float,
+):
+    """Resolve node collisions using measured text extents in display space.
+
+    This is the "final" reflow step: it uses detail-text boxes measured by the
+    matplotlib renderer, then shifts nodes until the plot is readable. That
+    readability is the point of this tool: it should be easy to see what
+    read_blend.py extracted before mapping it into Godot materials.
+
+    inputs:
+        ax: Matplotlib axes used for transforms.
+        nodes: List of node dicts (mutated in-place via loc).
+        detail_sizes: (N, 2) detail-text (width, height) in pixels from
+            _measure_detail_sizes, aligned with nodes.
+        detail_gap_y: Vertical gap between node and detail text (data coords).
+        detail_offset_x: Horizontal offset for detail text (data coords).
+    returns:
+        (N, 4) array of union bounding boxes in data coordinates, aligned with
+        nodes.
+    """
+    import numpy as np
+
+    ax.figure.canvas.draw()
 
-    fig.canvas.draw()
     inv = ax.transData.inverted()
     p0 = inv.transform((0.0, 0.0))
     py = inv.transform((0.0, 1.0))
     data_per_px_y = abs(float(py[1] - p0[1]))
 
-    shift_y = max(1e-6, data_per_px_y * 22.0)
-    max_tries = 900
     node_overlap_pad = 12.0
     detail_overlap_pad = 10.0
+    # Jumping the node top just below the lowest conflicting box clears every
+    # box it hit for good (nodes only move down), so this walk takes at most
+    # one jump per placed node and needs no retry cap.
+    jump_pad = max(node_overlap_pad, detail_overlap_pad) + 1e-3
 
-    sorted_nodes = sorted(nodes, key=_layout_sort_key)
+    order, geometry = _layout_order(nodes)
+    detail_size_rows = detail_sizes.tolist()
 
-    placed: list[dict[str, tuple[float, float, float, float] | None]] = []
-    boxes_data: dict[int, tuple[float, float, float, float]] = {}
+    placed = _PlacedBoxGrid(bucket_w=200.0, bucket_h=120.0)
+    union_boxes: list[tuple[float, float, float, float]] = []
 
-    for node in sorted_nodes:
-        x, y_top, width, height = _node_geometry(node)
-        detail_size = detail_sizes.get(id(node), (0.0, 0.0))
+    for index, (x, y_top, width, height) in zip(order, geometry.tolist()):
+        detail_size = detail_size_rows[index]
 
-        tries = 0
         node_box, detail_box, union_box = _layout_boxes_display(
             ax,
             x,
@@ -740,43 +999,242 @@ def _auto_space_nodes_display(
             detail_offset_x,
             detail_size,
         )
-        while _placement_conflicts(
-            node_box,
-            detail_box,
-            placed,
-            node_pad=node_overlap_pad,
-            detail_pad=detail_overlap_pad,
-        ):
-            tries += 1
-            y_top -= shift_y
-            node_box, detail_box, union_box = _layout_boxes_display(
-                ax,
-                x,
-                y_top,
-                width,
-                height,
-                detail_gap_y,
-                detail_offset_x,
-                detail_size,
+        while True:
+            conflict_bottom = placed.conflict_bottom(
+                node_box,
+                detail_box,
+                node_pad=node_overlap_pad,
+                detail_pad=detail_overlap_pad,
             )
-            if tries >= max_tries:
+            if conflict_bottom is None:
                 break
+            # The pixel footprint is fixed for the node, so translate it rather
+            # than re-transforming; only the final union box goes back to data.
+            drop_px = node_box[3] - (conflict_bottom - jump_pad)
+            y_top -= drop_px * data_per_px_y
+            node_box = _shift_box_y(node_box, -drop_px)
+            detail_box = _shift_box_y(detail_box, -drop_px)
+            union_box = _shift_box_y(union_box, -drop_px)
+
+        _set_node_top(nodes[index], y_top)
+        placed.add(node_box, detail_box)
+        union_boxes.append(union_box)
+
+    boxes_data = np.empty((len(nodes), 4), dtype=np.float64)
+    boxes_data[order] = _display_boxes_to_data(inv, union_boxes)
+    return boxes_data
 
-        node["loc"] = [x, y_top]
-        placed.append({"node": node_box, "detail": detail_box})
-        boxes_data[id(node)] = _display_box_to_data(ax, union_box)
 
-    return boxes_data
+def _auto_space_nodes_kernel(
+    xs,
+    y_tops,
+    widths,
+    heights,
+    detail_widths,
+    detail_heights,
+    detail_gap_y,
+    detail_offset_x,
+    node_pad,
+    detail_pad,
+    out_y_tops,
+    out_union_boxes,
+) -> None:
+    """
+    Array form of the rough collision solver, written for numba.njit.
+
+    Mirrors _PlacedBoxGrid.conflict_bottom plus the jump walk in
+    _auto_space_nodes, with the overlap tests inlined on scalars so the whole
+    loop compiles in nopython mode. Placed boxes are rebuilt from the already
+    solved rows instead of being stored, so the kernel allocates nothing.
+
+    inputs:
+        xs, y_tops, widths, heights: Per-node geometry in layout order.
+        detail_widths, detail_heights: Estimated detail-text sizes.
+        detail_gap_y: Vertical gap between node and detail text.
+        detail_offset_x: Horizontal offset for detail text.
+        node_pad: Padding for node collisions.
+        detail_pad: Padding for detail-text collisions.
+        out_y_tops: Output array for the solved node tops.
+        out_union_boxes: Output (N, 4) array for the solved union boxes.
+    returns:
+        None. Fills out_y_tops and out_union_boxes.
+    """
+    jump_pad = max(node_pad, detail_pad) + 1e-3
+
+    for i in range(xs.shape[0]):
+        x = xs[i]
+        y_top = y_tops[i]
+        with_detail = detail_widths[i] > 0.0 and detail_heights[i] > 0.0
+
+        while True:
+            n_left = x
+            n_right = x + widths[i]
+            n_bottom = y_top - heights[i]
+            d_left = x + detail_offset_x
+            d_right = d_left + detail_widths[i]
+            d_top = y_top - heights[i] - detail_gap_y
+            d_bottom = d_top - detail_heights[i]
+
+            bottom = math.inf
+            for j in range(i):
+                o_left = xs[j]
+                o_right = xs[j] + widths[j]
+                o_top = out_y_tops[j]
+                o_bottom = o_top - heights[j]
+                if (
+                    o_right + node_pad >= n_left
+                    and o_left <= n_right + node_pad
+                    and o_top + node_pad >= n_bottom
+                    and o_bottom <= y_top + node_pad
+                ) or (
+                    with_detail
+                    and o_right + node_pad >= d_left
+                    and o_left <= d_right + node_pad
+                    and o_top + node_pad >= d_bottom
+                    and o_bottom <= d_top + node_pad
+                ):
+                    bottom = min(bottom, o_bottom)
+
+                if not (detail_widths[j] > 0.0 and detail_heights[j] > 0.0):
+                    continue
+                o_left = xs[j] + detail_offset_x
+                o_right = o_left + detail_widths[j]
+                o_top = out_y_tops[j] - heights[j] - detail_gap_y
+                o_bottom = o_top - detail_heights[j]
+                if (
+                    o_right + node_pad >= n_left
+                    and o_left <= n_right + node_pad
+                    and o_top + node_pad >= n_bottom
+                    and o_bottom <= y_top + node_pad
+                ) or (
+                    with_detail
+                    and o_right + detail_pad >= d_left
+                    and o_left <= d_right + detail_pad
+                    and o_top + detail_pad >= d_bottom
+                    and o_bottom <= d_top + detail_pad
+                ):
+                    bottom = min(bottom, o_bottom)
+
+            if bottom == math.inf:
+                break
+            y_top = bottom - jump_pad
+
+        out_y_tops[i] = y_top
+        if with_detail:
+            out_union_boxes[i, 0] = min(n_left, d_left)
+            out_union_boxes[i, 1] = max(n_right, d_right)
+            out_union_boxes[i, 2] = min(n_bottom, d_bottom)
+            out_union_boxes[i, 3] = max(y_top, d_top)
+        else:
+            out_union_boxes[i, 0] = n_left
+            out_union_boxes[i, 1] = n_right
+            out_union_boxes[i, 2] = n_bottom
+            out_union_boxes[i, 3] = y_top
+
+
+# The kernel is O(N^2) and a fresh process pays ~0.45s to import numba and
+# load the compiled kernel; the grid solver costs about that much near 300
+# nodes, so smaller graphs never touch numba.
+_ROUGH_KERNEL_MIN_NODES = 300
+
+
+@functools.lru_cache(maxsize=None)
+def _load_rough_kernel():
+    """
+    Compile _auto_space_nodes_kernel with numba on first use.
+
+    numba is optional: without it the rough pass keeps using the grid solver.
+    The kernel is run once on a one-node input here, so a numba/llvmlite
+    install that imports but cannot compile also falls back to the grid.
+
+    returns:
+        The jitted kernel, or None if numba is missing or unusable.
+    """
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+    try:
+        kernel = numba.njit(cache=True)(_auto_space_nodes_kernel)
+        one = np.ones(1, dtype=np.float64)
+        kernel(one, one, one, one, one, one, 0.0, 0.0, 0.0, 0.0, np.empty(1), np.empty((1, 4)))
+    except Exception:
+        return None
+    return kernel
+
+
+def _run_rough_kernel(
+    kernel,
+    nodes: list[dict],
+    order: list[int],
+    geometry,
+    detail_meta: list[dict[str, object]],
+    detail_gap_y: float,
+    detail_offset_x: float,
+    line_height: float,
+    char_width: float,
+    node_pad: float,
+    detail_pad: float,
+):
+    """
+    Pack nodes into arrays, run the compiled rough solver, and unpack results.
+
+    inputs:
+        kernel: Jitted _auto_space_nodes_kernel.
+        nodes: Node dicts (mutated in-place via loc).
+        order: Node positions in layout order.
+        geometry: (N, 4) array of (x, y_top, width, height) in layout order.
+        detail_meta: Per-node detail text metadata, aligned with nodes.
+        detail_gap_y: Vertical gap between node and detail text.
+        detail_offset_x: Horizontal offset for detail text.
+        line_height: Estimated height of a text line (data coords).
+        char_width: Estimated width per character (data coords).
+        node_pad: Padding for node collisions.
+        detail_pad: Padding for detail-text collisions.
+    returns:
+        (N, 4) array of union bounding boxes in data coordinates, aligned with
+        nodes.
+    """
+    import numpy as np
+
+    detail_sizes = np.array(
+        [_detail_size_estimate(detail_meta[index], line_height, char_width) for index in order],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    xs = np.ascontiguousarray(geometry[:, 0])
+    out_y_tops = np.empty(len(order), dtype=np.float64)
+    out_union_boxes = np.empty((len(order), 4), dtype=np.float64)
+    kernel(
+        xs,
+        np.ascontiguousarray(geometry[:, 1]),
+        np.ascontiguousarray(geometry[:, 2]),
+        np.ascontiguousarray(geometry[:, 3]),
+        np.ascontiguousarray(detail_sizes[:, 0]),
+        np.ascontiguousarray(detail_sizes[:, 1]),
+        float(detail_gap_y),
+        float(detail_offset_x),
+        float(node_pad),
+        float(detail_pad),
+        out_y_tops,
+        out_union_boxes,
+    )
+
+    for index, y_top in zip(order, out_y_tops.tolist()):
+        _set_node_top(nodes[index], y_top)
+    node_boxes = np.empty((len(order), 4), dtype=np.float64)
+    node_boxes[order] = out_union_boxes
+    return node_boxes
 
 
 def _auto_space_nodes(
     nodes: list[dict],
-    detail_meta: dict[int, dict[str, object]],
+    detail_meta: list[dict[str, object]],
     detail_gap_y: float,
     detail_offset_x: float,
     line_height: float,
     char_width: float,
-) -> dict[int, tuple[float, float, float, float]]:
+):
     """
     Rough collision solver using estimated text widths/heights in data space.
 
@@ -786,31 +1244,51 @@ def _auto_space_nodes(
 
     inputs:
         nodes: List of node dicts (mutated in-place via loc).
-        detail_meta: Per-node detail text metadata.
+        detail_meta: Per-node detail text metadata, aligned with nodes.
         detail_gap_y: Vertical gap between node and detail text.
         detail_offset_x: Horizontal offset for detail text.
         line_height: Estimated height of a text line (data coords).
         char_width: Estimated width per character (data coords).
     returns:
-        Mapping of id(node_dict) -> union bounding box in data coordinates.
+        (N, 4) array of union bounding boxes in data coordinates, aligned with
+        nodes.
     """
+    import numpy as np
+
     node_overlap_pad = 30.0
     detail_overlap_pad = 42.0
-    shift_y = 52.0
-    max_tries = 1100
+    # See _auto_space_nodes_display: each jump clears the boxes it hit for good.
+    jump_pad = max(node_overlap_pad, detail_overlap_pad) + 1e-3
 
-    sorted_nodes = sorted(nodes, key=_layout_sort_key)
+    order, geometry = _layout_order(nodes)
 
-    placed_boxes: list[dict[str, tuple[float, float, float, float] | None]] = []
-    node_boxes: dict[int, tuple[float, float, float, float]] = {}
+    kernel = _load_rough_kernel() if len(order) >= _ROUGH_KERNEL_MIN_NODES else None
+    if kernel is not None:
+        try:
+            return _run_rough_kernel(
+                kernel,
+                nodes,
+                order,
+                geometry,
+                detail_meta,
+                detail_gap_y,
+                detail_offset_x,
+                line_height,
+                char_width,
+                node_overlap_pad,
+                detail_overlap_pad,
+            )
+        except Exception:
+            # Node locations are only written after the kernel returns, so the
+            # grid solver below still starts from the original layout.
+            pass
 
-    for node in sorted_nodes:
-        x, y_top, node_width, node_height = _node_geometry(node)
+    placed_boxes = _PlacedBoxGrid(bucket_w=200.0, bucket_h=120.0)
+    node_boxes = np.empty((len(nodes), 4), dtype=np.float64)
 
-        meta = detail_meta.get(id(node), {})
-        detail_width, detail_height = _detail_size_estimate(meta, line_height, char_width)
+    for index, (x, y_top, node_width, node_height) in zip(order, geometry.tolist()):
+        detail_width, detail_height = _detail_size_estimate(detail_meta[index], line_height, char_width)
 
-        tries = 0
         node_box, detail_box, box = _layout_boxes_data(
             x,
             y_top,
@@ -821,15 +1299,16 @@ def _auto_space_nodes(
             detail_gap_y,
             detail_offset_x,
         )
-        while _placement_conflicts(
-            node_box,
-            detail_box,
-            placed_boxes,
-            node_pad=node_overlap_pad,
-            detail_pad=detail_overlap_pad,
-        ):
-            y_top -= shift_y
-            tries += 1
+        while True:
+            conflict_bottom = placed_boxes.conflict_bottom(
+                node_box,
+                detail_box,
+                node_pad=node_overlap_pad,
+                detail_pad=detail_overlap_pad,
+            )
+            if conflict_bottom is None:
+                break
+            y_top = conflict_bottom - jump_pad
             node_box, detail_box, box = _layout_boxes_data(
                 x,
                 y_top,
@@ -840,17 +1319,15 @@ def _auto_space_nodes(
                 detail_gap_y,
                 detail_offset_x,
             )
-            if tries >= max_tries:
-                break
 
-        node["loc"] = [x, y_top]
-        placed_boxes.append({"node": node_box, "detail": detail_box, "union": box})
-        node_boxes[id(node)] = box
+        _set_node_top(nodes[index], y_top)
+        placed_boxes.add(node_box, detail_box)
+        node_boxes[index] = box
 
     return node_boxes
 
 
-def _build_detail_meta(nodes: list[dict], hide_socket_details: bool, wrap_width: int) -> dict[int, dict[str, object]]:
+def _build_detail_meta(nodes: list[dict], hide_socket_details: bool, wrap_width: int) -> list[dict[str, object]]:
     """
     Build per-node detail-text metadata used for layout/drawing.
 
@@ -863,14 +1340,18 @@ def _build_detail_meta(nodes: list[dict], hide_socket_details: bool, wrap_width:
         hide_socket_details: Whether detail text should be suppressed.
         wrap_width: Approximate character width before line wrapping.
     returns:
-        Mapping id(node_dict) -> detail metadata dict.
+        Detail metadata dicts aligned with nodes.
     """
     if hide_socket_details:
-        return {id(node): {"draw_lines": [], "line_count": 0, "max_chars": 0} for node in nodes}
-    return {id(node): _detail_text_block(node, wrap_width) for node in nodes}
+        return [_EMPTY_DETAIL_META] * len(nodes)
+    try:
+        return [_detail_text_block(node, wrap_width) for node in nodes]
+    finally:
+        # id() keys are only safe while the values they name are alive.
+        _DUMPS_CACHE.clear()
 
 
-def _boxes_extents(node_boxes: dict[int, tuple[float, float, float, float]]) -> tuple[float, float, float, float]:
+def _boxes_extents(node_boxes) -> tuple[float, float, float, float]:
     """
     Compute min/max layout extents from union node boxes.
 
@@ -878,32 +1359,28 @@ def _boxes_extents(node_boxes: dict[int, tuple[float, float, float, float]]) ->
     node and detail block.
 
     inputs:
-        node_boxes: Mapping of node id -> (left, right, bottom, top).
+        node_boxes: (N, 4) array of (left, right, bottom, top) rows.
     returns:
         Tuple (min_x, max_x, min_y, max_y).
     """
-    min_x = float("inf")
-    max_x = float("-inf")
-    min_y = float("inf")
-    max_y = float("-inf")
-    for left, right, bottom, top in node_boxes.values():
-        min_x = min(min_x, left)
-        max_x = max(max_x, right)
-        min_y = min(min_y, bottom)
-        max_y = max(max_y, top)
-    return min_x, max_x, min_y, max_y
+    if len(node_boxes) == 0:
+        return float("inf"), float("-inf"), float("inf"), float("-inf")
+    mins = node_boxes.min(axis=0)
+    maxs = node_boxes.max(axis=0)
+    return float(mins[0]), float(maxs[1]), float(mins[2]), float(maxs[3])
 
 
 def _fit_canvas_layout(
     ax,
     fig,
     nodes: list[dict],
-    base_locs: dict[int, list[float]],
-    detail_meta: dict[int, dict[str, object]],
+    base_locs: list[list[float]],
+    detail_meta: list[dict[str, object]],
     detail_font_size: float,
     detail_gap_y: float,
     detail_offset_x: float,
-) -> dict[int, tuple[float, float, float, float]]:
+    headless: bool,
+):
     """
     Reflow node layout and grow canvas until all content fits in axis limits.
 
@@ -916,71 +1393,139 @@ def _fit_canvas_layout(
         ax: Matplotlib axes used for layout transforms.
         fig: Matplotlib figure that may be resized.
         nodes: Node dicts that will have loc updated in-place.
-        base_locs: Original node locations keyed by id(node_dict).
-        detail_meta: Per-node detail text metadata.
+        base_locs: Original node locations, aligned with nodes.
+        detail_meta: Per-node detail text metadata, aligned with nodes.
         detail_font_size: Font size used for detail text.
         detail_gap_y: Vertical gap below each node.
         detail_offset_x: Horizontal detail offset from each node.
+        headless: True when the figure is only saved to a file, so resizes
+            need not be forwarded to a GUI window.
     returns:
-        Mapping of node id -> union box in data coordinates after final layout.
+        (N, 4) array of union boxes in data coordinates after final layout,
+        aligned with nodes.
     """
-    node_boxes = {}
+    node_boxes = None
+    detail_sizes = _measure_detail_sizes(ax, detail_meta, detail_font_size)
     max_canvas_attempts = 6
-    canvas_growth = 1.35
+    growth_margin = 1.05
+    # Layout passes draw the canvas, so its size has to stay allocatable.
+    max_total_growth = 6.0
+    total_growth = 1.0
 
     for _ in range(max_canvas_attempts):
-        for node in nodes:
-            node["loc"] = list(base_locs[id(node)])
+        # Only reset nodes the previous pass moved, so untouched nodes keep
+        # their loc object and with it the _node_geometry memo.
+        for node, loc in zip(nodes, base_locs):
+            if node.get("loc") != loc:
+                node["loc"] = list(loc)
 
         node_boxes = _auto_space_nodes_display(
             ax,
             nodes=nodes,
-            detail_meta=detail_meta,
-            detail_font_size=detail_font_size,
+            detail_sizes=detail_sizes,
             detail_gap_y=detail_gap_y,
             detail_offset_x=detail_offset_x,
         )
 
         xlim = ax.get_xlim()
         ylim = ax.get_ylim()
-        outside = sum(
-            1
-            for left, right, bottom, top in node_boxes.values()
-            if left < xlim[0] or right > xlim[1] or bottom < ylim[0] or top > ylim[1]
-        )
-        if outside == 0:
+        if not _boxes_outside(node_boxes, xlim, ylim):
+            break
+
+        # Grow by an amount derived from the measured overflow instead of a
+        # fixed step. Text is sized in points, so it shrinks in data units as
+        # the canvas grows and the overflow falls off faster than linearly;
+        # the 2/3 power keeps the step from overshooting on dense graphs.
+        left, bottom = node_boxes[:, [0, 2]].min(axis=0).tolist()
+        right, top = node_boxes[:, [1, 3]].max(axis=0).tolist()
+        need_x = max(0.0, xlim[0] - left) + max(0.0, right - xlim[1])
+        need_y = max(0.0, ylim[0] - bottom) + max(0.0, top - ylim[1])
+        span_x = xlim[1] - xlim[0]
+        span_y = ylim[1] - ylim[0]
+        overflow = max((span_x + need_x) / span_x, (span_y + need_y) / span_y)
+        growth = min(overflow ** (2.0 / 3.0) * growth_margin, max_total_growth / total_growth)
+        if growth <= 1.0:
             break
+        total_growth *= growth
 
         width_in, height_in = fig.get_size_inches()
-        fig.set_size_inches(width_in * canvas_growth, height_in * canvas_growth, forward=True)
+        fig.set_size_inches(width_in * growth, height_in * growth, forward=not headless)
 
     return node_boxes
 
 
-def _capture_original_locations(nodes: list[dict]) -> dict[int, list[float]]:
+def _boxes_outside(boxes, xlim: tuple[float, float], ylim: tuple[float, float]) -> bool:
     """
-    Capture current node locations for later layout resets.
-
-    The canvas-fitting step runs multiple layout passes; keeping the original
-    locations makes those passes deterministic.
+    Check whether any (left, right, bottom, top) box leaves the axis limits.
 
     inputs:
-        nodes: List of serialized node dicts.
+        boxes: (N, 4) array of boxes in data coordinates.
+        xlim: Axis x limits.
+        ylim: Axis y limits.
     returns:
-        Mapping id(node_dict) -> [x, y_top] location list.
+        True if at least one box extends past a limit.
     """
-    return {
-        id(node): [
-            float((node.get("loc") or (0.0, 0.0))[0]),
-            float((node.get("loc") or (0.0, 0.0))[1]),
-        ]
-        for node in nodes
-    }
+    import numpy as np
+
+    return bool(
+        np.any(
+            (boxes[:, 0] < xlim[0])
+            | (boxes[:, 1] > xlim[1])
+            | (boxes[:, 2] < ylim[0])
+            | (boxes[:, 3] > ylim[1])
+        )
+    )
+
+
+def _set_fixed_margins(fig, ax, pad_in: float) -> None:
+    """
+    Place the axes with tight_layout's margins without measuring every artist.
+
+    Once the canvas fit has put all content inside the axis limits, the only
+    thing tight_layout still accounts for is the title, so the margins can be
+    set directly from the title's height.
+
+    inputs:
+        fig: Matplotlib figure holding a single axes.
+        ax: The axes to place.
+        pad_in: Margin on each side, in inches.
+    returns:
+        None. Mutates the figure subplot parameters.
+    """
+    renderer = fig.canvas.get_renderer()
+    width_in, height_in = fig.get_size_inches()
+    title_top_px = ax.title.get_window_extent(renderer=renderer).y1 - ax.bbox.y1
+    top_in = pad_in + max(0.0, title_top_px) / fig.dpi
+    fig.subplots_adjust(
+        left=pad_in / width_in,
+        right=1.0 - pad_in / width_in,
+        bottom=pad_in / height_in,
+        top=1.0 - top_in / height_in,
+    )
+
+
+def _capture_original_locations(nodes: list[dict]) -> list[list[float]]:
+    """
+    Capture current node locations for later layout resets.
 
+    The canvas-fitting step runs multiple layout passes; keeping the original
+    locations makes those passes deterministic.
 
-def _socket_positions_map(nodes: list[dict]) -> dict[int, tuple[float, float]]:
+    inputs:
+        nodes: List of serialized node dicts.
+    returns:
+        [x, y_top] location lists aligned with nodes.
     """
-    Build a map of all socket anchor coordinates for all nodes.
+    locations: list[list[float]] = []
+    for node in nodes:
+        x, y_top = node.get("loc") or (0.0, 0.0)
+        locations.append([float(x), float(y_top)])
+    return locations
+
+
+def _graph_maps(nodes: list[dict]) -> tuple[dict, dict[int, tuple[float, float]]]:
+    """
+    Build the node-row-by-ptr and socket anchor maps in a single pass over nodes.
 
     These anchors make link arrows land near the right sockets, which makes it
     easier to trace the extracted shading flow while planning a Godot mapping.
@@ -988,98 +1533,253 @@ def _socket_positions_map(nodes: list[dict]) -> dict[int, tuple[float, float]]:
     inputs:
         nodes: List of serialized node dicts.
     returns:
-        Mapping socket ptr -> (x, y) in data coordinates.
+        Tuple (node_rows, socket_pos): mapping node ptr -> index into nodes, and
+        mapping socket ptr -> (x, y) in data coordinates.
     """
+    node_rows: dict = {}
     socket_pos: dict[int, tuple[float, float]] = {}
-    for node in nodes:
-        socket_pos.update(_compute_socket_positions(node, "inputs"))
-        socket_pos.update(_compute_socket_positions(node, "outputs"))
-    return socket_pos
+    for row, node in enumerate(nodes):
+        ptr = node.get("ptr")
+        if ptr:
+            node_rows[ptr] = row
+        for socket_ptr, position in _iter_node_sockets(node):
+            socket_pos[socket_ptr] = position
+    return node_rows, socket_pos
 
 
-def _draw_links(
-    ax,
+def _link_endpoints(
     links: list[dict],
-    nodes_by_ptr: dict,
+    geometry,
+    node_rows: dict,
     socket_pos: dict[int, tuple[float, float]],
-    patches,
-    label_links: bool,
-) -> None:
+):
     """
-    Draw node-link arrows (and optional labels) onto an axes.
+    Resolve every drawable link to its start/end point in data coordinates.
 
-    This makes it easier to follow the extracted shading flow when comparing to
-    Blender and when planning how it should become Godot material parameters.
+    Socket anchors are used where known, node edge midpoints otherwise, so the
+    arrows land near the right sockets even for partially exported nodes.
 
     inputs:
-        ax: Matplotlib axes to draw on.
         links: Serialized link dicts.
-        nodes_by_ptr: Mapping node ptr -> node dict.
+        geometry: (N, 4) node geometry array from _all_node_geometries.
+        node_rows: Mapping node ptr -> row in geometry.
         socket_pos: Mapping socket ptr -> (x, y).
-        patches: matplotlib.patches module-like object.
-        label_links: Whether to render link labels at arrow midpoints.
     returns:
-        None. Mutates the axes by drawing link artists.
+        Tuple (starts, ends, link_sockets): (L, 2) start and end arrays plus
+        the (from_socket, to_socket) dicts of each link, or None when no link
+        connects two plotted nodes.
     """
+    import numpy as np
+
+    # Resolve every link to row indices first, then compute all endpoints at
+    # once.
+    socket_rows = {ptr: row for row, ptr in enumerate(socket_pos)}
+    link_rows: list[tuple[int, int, int, int]] = []
+    link_sockets: list[tuple[dict, dict]] = []
     for link in links:
-        from_node_ptr = (link.get("from_node") or {}).get("ptr")
-        to_node_ptr = (link.get("to_node") or {}).get("ptr")
-        from_sock_ptr = (link.get("from_socket") or {}).get("ptr")
-        to_sock_ptr = (link.get("to_socket") or {}).get("ptr")
-
-        from_node = nodes_by_ptr.get(from_node_ptr)
-        to_node = nodes_by_ptr.get(to_node_ptr)
-        if not from_node or not to_node:
+        from_row = node_rows.get((link.get("from_node") or _EMPTY_REF).get("ptr"))
+        to_row = node_rows.get((link.get("to_node") or _EMPTY_REF).get("ptr"))
+        if from_row is None or to_row is None:
             continue
+        from_socket = link.get("from_socket") or _EMPTY_REF
+        to_socket = link.get("to_socket") or _EMPTY_REF
+        from_sock_row = socket_rows.get(from_socket.get("ptr"), -1)
+        to_sock_row = socket_rows.get(to_socket.get("ptr"), -1)
+        link_rows.append((from_row, to_row, from_sock_row, to_sock_row))
+        link_sockets.append((from_socket, to_socket))
+
+    if not link_rows:
+        return None
 
-        fx, fy_top, fw, fh = _node_geometry(from_node)
-        tx, ty_top, _, th = _node_geometry(to_node)
-        start = socket_pos.get(from_sock_ptr) or (fx + fw, fy_top - fh * 0.5)
-        end = socket_pos.get(to_sock_ptr) or (tx, ty_top - th * 0.5)
-
-        arrow = patches.FancyArrowPatch(
-            start,
-            end,
-            arrowstyle="->",
-            mutation_scale=8,
-            linewidth=1.0,
-            color="#1f77b4",
-            alpha=0.75,
-            zorder=1,
-        )
-        ax.add_patch(arrow)
+    rows = np.array(link_rows, dtype=np.intp)
+    socket_xy = np.array(list(socket_pos.values()), dtype=np.float64).reshape(-1, 2)
 
-        if not label_links:
-            continue
-        from_socket_name = ((link.get("from_socket") or {}).get("name") or "").strip()
-        to_socket_name = ((link.get("to_socket") or {}).get("name") or "").strip()
+    from_geom = geometry[rows[:, 0]]
+    to_geom = geometry[rows[:, 1]]
+    starts = np.column_stack((from_geom[:, 0] + from_geom[:, 2], from_geom[:, 1] - from_geom[:, 3] * 0.5))
+    ends = np.column_stack((to_geom[:, 0], to_geom[:, 1] - to_geom[:, 3] * 0.5))
+    has_from = rows[:, 2] >= 0
+    has_to = rows[:, 3] >= 0
+    starts[has_from] = socket_xy[rows[has_from, 2]]
+    ends[has_to] = socket_xy[rows[has_to, 3]]
+    return starts, ends, link_sockets
+
+
+def _draw_link_labels(ax, starts, ends, link_sockets: list[tuple[dict, dict]]) -> None:
+    """
+    Label each link with its "from -> to" socket names at the link midpoint.
+
+    inputs:
+        ax: Matplotlib axes to draw on.
+        starts: (L, 2) link start points from _link_endpoints.
+        ends: (L, 2) link end points from _link_endpoints.
+        link_sockets: (from_socket, to_socket) dicts aligned with starts/ends.
+    returns:
+        None. Mutates the axes by adding text artists.
+    """
+    midpoints = ((starts + ends) * 0.5).tolist()
+    for (from_socket, to_socket), (mid_x, mid_y) in zip(link_sockets, midpoints):
+        from_socket_name = (from_socket.get("name") or "").strip()
+        to_socket_name = (to_socket.get("name") or "").strip()
         label = f"{from_socket_name} -> {to_socket_name}".strip(" ->")
         if not label:
             continue
-        ax.text(
-            (start[0] + end[0]) * 0.5,
-            (start[1] + end[1]) * 0.5,
-            label,
-            fontsize=6,
-            color="#1f77b4",
-            zorder=2,
-        )
+        ax.text(mid_x, mid_y, label, fontsize=6, color="#1f77b4", zorder=2)
+
+
+def _draw_links(ax, starts, ends) -> None:
+    """
+    Draw node-link arrows onto an axes.
+
+    This makes it easier to follow the extracted shading flow when comparing to
+    Blender and when planning how it should become Godot material parameters.
+    All shafts go into one LineCollection and all "->" heads into a second one,
+    instead of one FancyArrowPatch per link.
+
+    The end shrink and head directions are worked out from ax.transData when
+    this runs, so call it after the axes box is final (after tight_layout /
+    _set_fixed_margins). Resizing a plt.show() window afterwards changes the
+    x/y scale ratio and leaves the heads slightly off the shaft direction;
+    saved files are unaffected.
+
+    inputs:
+        ax: Matplotlib axes to draw on.
+        starts: (L, 2) link start points from _link_endpoints.
+        ends: (L, 2) link end points from _link_endpoints.
+    returns:
+        None. Mutates the axes by drawing link artists.
+    """
+    import numpy as np
+    from matplotlib.collections import LineCollection
+    from matplotlib.transforms import Affine2D
+
+    # Like FancyArrowPatch's default shrinkA/shrinkB, pull both ends 2pt in so
+    # heads stay clear of the socket dots. Points and data pixels both scale
+    # with DPI, so the shrink is worked out once in display space.
+    starts_px = ax.transData.transform(starts)
+    ends_px = ax.transData.transform(ends)
+    direction = ends_px - starts_px
+    length = np.hypot(direction[:, 0], direction[:, 1])
+    direction[length == 0.0] = (1.0, 0.0)
+    direction /= np.where(length == 0.0, 1.0, length)[:, None]
+    shrink = np.minimum(2.0 * ax.figure.dpi / 72.0, length * 0.5)[:, None]
+    inv = ax.transData.inverted()
+    starts = inv.transform(starts_px + shrink * direction)
+    ends = inv.transform(ends_px - shrink * direction)
+
+    style = {"colors": "#1f77b4", "linewidths": 1.0, "alpha": 0.75, "zorder": 1}
+    ax.add_collection(LineCollection(np.stack((starts, ends), axis=1), **style), autolim=False)
+
+    # "->" heads with mutation_scale=8: 3.2pt long, 1.6pt half-width chevrons
+    # built in points around each end, pointing along the on-screen direction.
+    normal = np.column_stack((-direction[:, 1], direction[:, 0]))
+    back = -3.2 * direction
+    heads = np.stack((back + 1.6 * normal, np.zeros_like(back), back - 1.6 * normal), axis=1)
+    ax.add_collection(
+        LineCollection(
+            heads,
+            offsets=ends,
+            offset_transform=ax.transData,
+            transform=Affine2D().scale(1.0 / 72.0) + ax.figure.dpi_scale_trans,
+            joinstyle="miter",
+            **style,
+        ),
+        autolim=False,
+    )
+
+
+def _draw_node_rects(ax, geometry) -> None:
+    """
+    Draw every node rectangle as a single PatchCollection.
+
+    One collection artist instead of one Rectangle patch per node keeps the
+    draw (and the per-patch data-limit updates) from scaling with node count.
+
+    inputs:
+        ax: Matplotlib axes to draw on.
+        geometry: (N, 4) node geometry array from _all_node_geometries.
+    returns:
+        None. Mutates the axes by adding the rectangle collection.
+    """
+    from matplotlib.collections import PatchCollection
+    from matplotlib.patches import Rectangle
+
+    rects = [
+        Rectangle((x, y_top - height), width, height)
+        for x, y_top, width, height in geometry.tolist()
+    ]
+    ax.add_collection(
+        PatchCollection(
+            rects,
+            linewidths=1.0,
+            edgecolors="#222222",
+            facecolors="#f0f0f0",
+            alpha=0.95,
+            joinstyle="miter",
+            zorder=3,
+        ),
+        autolim=False,
+    )
+
+
+def _draw_socket_markers(ax, nodes: list[dict], socket_pos: dict[int, tuple[float, float]]):
+    """
+    Draw every socket dot with a single scatter call.
+
+    Green marks linked sockets and gray unlinked ones, which makes it quick to
+    spot inputs that are driven by other nodes versus plain defaults.
+
+    inputs:
+        ax: Matplotlib axes to draw on.
+        nodes: Serialized node dicts.
+        socket_pos: Mapping socket ptr -> (x, y).
+    returns:
+        The marker PathCollection, or None if there were no sockets to draw.
+    """
+    import numpy as np
+    from matplotlib.colors import to_rgba_array
+
+    positions: list[tuple[float, float]] = []
+    linked: list[bool] = []
+    for node in nodes:
+        for side in ("inputs", "outputs"):
+            for socket in node.get(side) or []:
+                ptr = socket.get("ptr")
+                if not ptr:
+                    continue
+                pos = socket_pos.get(int(ptr))
+                if not pos:
+                    continue
+                positions.append(pos)
+                linked.append(bool(socket.get("is_linked")))
+    if not positions:
+        return None
+    # Index a two-row (unlinked, linked) RGBA palette with the mask so the
+    # colors reach the collection as one array, not a string per socket.
+    palette = to_rgba_array(["#777777", "#2ca02c"])
+    colors = palette[np.array(linked, dtype=np.intp)]
+    xy = np.array(positions, dtype=np.float64)
+    # Matches the old per-socket ax.plot markers: markersize 2.5 (s is in
+    # points squared) with a 1pt edge in the face color.
+    return ax.scatter(xy[:, 0], xy[:, 1], s=2.5**2, c=colors, marker="o", linewidths=1.0, zorder=5)
 
 
 def _draw_node(
     ax,
-    node: dict,
-    detail_meta: dict[int, dict[str, object]],
-    detail_font_size: float,
+    title: str,
+    geometry: tuple[float, float, float, float],
+    meta: dict[str, object],
+    title_font,
+    detail_font,
     detail_gap_y: float,
     detail_offset_x: float,
-    draw_sockets: bool,
     hide_socket_details: bool,
-    socket_pos: dict[int, tuple[float, float]],
-    patches,
 ) -> None:
     """
-    Draw a single node rectangle, title, socket dots, and detail text.
+    Draw a single node's title and detail text.
+
+    Node rectangles and socket dots are drawn for all nodes at once by
+    _draw_node_rects and _draw_socket_markers.
 
     The detail text is intentionally verbose: it exposes identifiers and defaults
     that often become Godot uniforms/parameters, which helps validate conversion
@@ -1087,78 +1787,196 @@ def _draw_node(
 
     inputs:
         ax: Matplotlib axes to draw on.
-        node: Serialized node dict.
-        detail_meta: Per-node detail text metadata map.
-        detail_font_size: Font size used for detail text.
+        title: This node's display title (see _display_title).
+        geometry: This node's (x, y_top, width, height).
+        meta: This node's detail text metadata.
+        title_font: Shared FontProperties for node titles.
+        detail_font: Shared (monospace) FontProperties for detail text.
         detail_gap_y: Vertical gap below node for detail text.
         detail_offset_x: Horizontal offset for detail text anchor.
-        draw_sockets: Whether to draw socket markers.
         hide_socket_details: Whether to suppress detail text.
-        socket_pos: Mapping socket ptr -> (x, y).
-        patches: matplotlib.patches module-like object.
     returns:
         None. Mutates the axes by drawing node artists.
     """
-    x, y_top, width, height = _node_geometry(node)
-
-    rect = patches.Rectangle(
-        (x, y_top - height),
-        width,
-        height,
-        linewidth=1.0,
-        edgecolor="#222222",
-        facecolor="#f0f0f0",
-        alpha=0.95,
-        zorder=3,
-    )
-    ax.add_patch(rect)
+    x, y_top, width, height = geometry
 
-    title = _node_title(node)
-    if len(title) > 38:
-        title = title[:35] + "..."
     ax.text(
         x + width * 0.5,
         y_top - height * 0.5,
         title,
         ha="center",
         va="center",
-        fontsize=7,
+        fontproperties=title_font,
         color="#111111",
         zorder=4,
     )
 
-    if draw_sockets:
-        for side in ("inputs", "outputs"):
-            for socket in node.get(side) or []:
-                ptr = socket.get("ptr")
-                if not ptr:
-                    continue
-                pos = socket_pos.get(int(ptr))
-                if not pos:
-                    continue
-                color = "#2ca02c" if socket.get("is_linked") else "#777777"
-                ax.plot([pos[0]], [pos[1]], marker="o", markersize=2.5, color=color, zorder=5)
-
     if hide_socket_details:
         return
 
-    draw_lines = (detail_meta.get(id(node), {}) or {}).get("draw_lines") or []
-    if not draw_lines:
+    draw_text = meta.get("draw_text")
+    if not draw_text:
         return
     ax.text(
         x + detail_offset_x,
         y_top - height - detail_gap_y,
-        "\n".join(draw_lines),
+        draw_text,
         ha="left",
         va="top",
-        fontsize=detail_font_size,
+        fontproperties=detail_font,
         linespacing=1.1,
-        family="monospace",
         color="#111111",
         zorder=4,
     )
 
 
+def _plot_material(data: dict, material: dict, out: Path | None, args: argparse.Namespace) -> None:
+    """
+    Render one material's node graph, then save it or show it in a window.
+
+    main resolves matplotlib (offering to install it) before calling this, so
+    a batch of materials shares one interpreter and one set of imports.
+
+    inputs:
+        data: Parsed JSON dict from read_blend.py.
+        material: Material dict selected with _pick_material.
+        out: Output image filename, or None to show a window.
+        args: Parsed CLI options (format, dpi, drawing flags).
+    returns:
+        None. Saves an image (when out is provided) or shows a window.
+    raises:
+        SystemExit: If the material has no exported nodes.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.font_manager import FontProperties
+
+    node_tree = material.get("node_tree") or {}
+    nodes = node_tree.get("nodes") or []
+    links = node_tree.get("links") or []
+    original_locations = _capture_original_locations(nodes)
+
+    if not nodes:
+        raise SystemExit("Selected material has no exported nodes to plot.")
+
+    detail_font_size = 4.5
+    detail_line_height = 11.5
+    detail_char_width = 9.2
+    detail_gap_y = 8.0
+    detail_offset_x = 2.0
+    # Text artists copy their FontProperties, so one of each can be shared.
+    title_font = FontProperties(size=7)
+    detail_font = FontProperties(size=detail_font_size, family="monospace")
+
+    detail_meta = _build_detail_meta(
+        nodes,
+        hide_socket_details=args.hide_socket_details,
+        wrap_width=args.socket_wrap_width,
+    )
+
+    node_boxes = _auto_space_nodes(
+        nodes,
+        detail_meta=detail_meta,
+        detail_gap_y=detail_gap_y,
+        detail_offset_x=detail_offset_x,
+        line_height=detail_line_height,
+        char_width=detail_char_width,
+    )
+
+    min_x, max_x, min_y, max_y = _boxes_extents(node_boxes)
+
+    if out:
+        # Saving only: a bare Agg-backed Figure skips pyplot's figure manager
+        # (and any GUI window) entirely.
+        fig = Figure(figsize=(12, 8))
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
+    else:
+        fig, ax = plt.subplots(figsize=(12, 8))
+    # Limits are set explicitly and refit by _fit_canvas_layout, so artists
+    # never need to feed data limits; the collections added here directly
+    # skip the data-limit update too (autolim=False).
+    ax.set_autoscale_on(False)
+    ax.set_title(f"\"{material.get('name', '<material>')}\" {node_tree.get('name', '<node_tree>')}")
+    rough_pad = 180.0
+    ax.set_xlim(min_x - rough_pad, max_x + rough_pad)
+    ax.set_ylim(min_y - rough_pad, max_y + rough_pad)
+
+    node_boxes = _fit_canvas_layout(
+        ax,
+        fig,
+        nodes=nodes,
+        base_locs=original_locations,
+        detail_meta=detail_meta,
+        detail_font_size=detail_font_size,
+        detail_gap_y=detail_gap_y,
+        detail_offset_x=detail_offset_x,
+        headless=bool(out),
+    )
+
+    geometry = _all_node_geometries(nodes)
+    node_rows, socket_pos = _graph_maps(nodes)
+    link_ends = _link_endpoints(links, geometry, node_rows, socket_pos)
+    if link_ends is not None and args.label_links:
+        _draw_link_labels(ax, *link_ends)
+    _draw_node_rects(ax, geometry)
+    titles = [_display_title(node) for node in nodes]
+    for title, node_geometry, meta in zip(titles, geometry.tolist(), detail_meta):
+        _draw_node(
+            ax,
+            title,
+            geometry=node_geometry,
+            meta=meta,
+            title_font=title_font,
+            detail_font=detail_font,
+            detail_gap_y=detail_gap_y,
+            detail_offset_x=detail_offset_x,
+            hide_socket_details=args.hide_socket_details,
+        )
+    socket_markers = _draw_socket_markers(ax, nodes, socket_pos) if args.draw_sockets else None
+
+    ax.axis("off")
+
+    # tight_layout re-measures every artist. When the canvas fit already put
+    # all content inside the axes, large graphs can take the same margins
+    # (its default 1.08 x 10pt pad) straight from the title instead.
+    if len(nodes) >= 50 and not _boxes_outside(node_boxes, ax.get_xlim(), ax.get_ylim()):
+        _set_fixed_margins(fig, ax, pad_in=0.15)
+    else:
+        fig.tight_layout()
+
+    # Link heads are sized and aimed in display space, so they are drawn once
+    # the axes box is final. The link collections are clipped to the axes, so
+    # the margin step would not have measured them anyway.
+    if link_ends is not None:
+        _draw_links(ax, link_ends[0], link_ends[1])
+
+    if out:
+        blend_stem = _blend_stem_from_export(data, args.json_path)
+        out_dir = _material_outputs_dir(blend_stem)
+        out_format = _output_format(str(out), args.format)
+        out_name = _clean_output_filename(str(out), default_suffix=f".{out_format}")
+        if out_format == "png" and _raster_too_large(fig, args.dpi):
+            out_format = "svg"
+            print("Canvas is too large for a PNG; saving as SVG instead.")
+        elif args.rasterize_links and out_format != "png":
+            # Bake links (zorder 1) and socket dots into images; node
+            # rectangles and text stay vector. Skipped for the oversized-PNG
+            # fallback, whose raster pass would hit the same Agg limits.
+            ax.set_rasterization_zorder(2)
+            if socket_markers is not None:
+                socket_markers.set_rasterized(True)
+        if Path(out_name).suffix.lower().lstrip(".") in OUTPUT_FORMATS:
+            out_name = Path(out_name).with_suffix(f".{out_format}").name
+        out_path = out_dir / out_name
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(out_path, dpi=args.dpi, format=out_format)
+        print(f"Wrote {out_path}")
+    else:
+        plt.show()
+
+
 def main() -> None:
     """
     CLI entrypoint: render a node graph from exported JSON.
@@ -1183,18 +2001,32 @@ def main() -> None:
     )
     parser.add_argument(
         "--material",
+        action="append",
         default=None,
-        help="Material name to plot (defaults to first with a node tree)",
+        help=(
+            "Material name to plot (defaults to first with a node tree). Repeat "
+            "with a matching --out each to plot several materials in one run."
+        ),
     )
     parser.add_argument(
         "--out",
         type=Path,
+        action="append",
         default=None,
         help=(
-            "Output image filename (graph.png). Saved under "
+            "Output image filename (graph.png, graph.svg, graph.pdf). Saved under "
             "Material Outputs/<blend-stem>/. If omitted, shows a window."
         ),
     )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help=(
+            "Output image format (default: from the --out suffix, else png). "
+            "PNGs too large for Agg are written as SVG instead."
+        ),
+    )
     parser.add_argument(
         "--dpi",
         type=int,
@@ -1211,6 +2043,14 @@ def main() -> None:
         action="store_true",
         help="Label links with socket names (can get cluttered)",
     )
+    parser.add_argument(
+        "--rasterize-links",
+        action="store_true",
+        help=(
+            "For SVG/PDF output, embed links and socket markers as images "
+            "(smaller only for graphs with very many links)"
+        ),
+    )
     parser.add_argument(
         "--hide-socket-details",
         action="store_true",
@@ -1224,19 +2064,16 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    data = json.loads(args.json_path.read_text(encoding="utf-8"))
-    material = _pick_material(data, args.material)
-    node_tree = material.get("node_tree") or {}
-    nodes = node_tree.get("nodes") or []
-    links = node_tree.get("links") or []
-    original_locations = _capture_original_locations(nodes)
-
-    if not nodes:
-        raise SystemExit("Selected material has no exported nodes to plot.")
+    data = _load_export(args.json_path)
+    materials = args.material or [None]
+    outs = args.out or []
+    if outs and len(outs) != len(materials):
+        parser.error("pass one --out per --material when plotting several materials")
+    if not outs and len(materials) > 1:
+        parser.error("plotting several materials requires an --out for each")
 
     try:
-        import matplotlib.pyplot as plt
-        from matplotlib import patches
+        import matplotlib  # noqa: F401
     except ModuleNotFoundError:
         import sys
 
@@ -1250,82 +2087,30 @@ def main() -> None:
             import subprocess
 
             subprocess.run([sys.executable, "-m", "pip", "install", "matplotlib"], check=True)
-            import matplotlib.pyplot as plt
-            from matplotlib import patches
+            import matplotlib  # noqa: F401
         else:
             raise SystemExit("matplotlib is required for plotting.")
 
-    detail_font_size = 4.5
-    detail_line_height = 11.5
-    detail_char_width = 9.2
-    detail_gap_y = 8.0
-    detail_offset_x = 2.0
-
-    detail_meta = _build_detail_meta(
-        nodes,
-        hide_socket_details=args.hide_socket_details,
-        wrap_width=args.socket_wrap_width,
-    )
-
-    node_boxes = _auto_space_nodes(
-        nodes,
-        detail_meta=detail_meta,
-        detail_gap_y=detail_gap_y,
-        detail_offset_x=detail_offset_x,
-        line_height=detail_line_height,
-        char_width=detail_char_width,
-    )
-
-    min_x, max_x, min_y, max_y = _boxes_extents(node_boxes)
-
-    fig, ax = plt.subplots(figsize=(12, 8))
-    ax.set_title(f"\"{material.get('name', '<material>')}\" {node_tree.get('name', '<node_tree>')}")
-    rough_pad = 180.0
-    ax.set_xlim(min_x - rough_pad, max_x + rough_pad)
-    ax.set_ylim(min_y - rough_pad, max_y + rough_pad)
-
-    _fit_canvas_layout(
-        ax,
-        fig,
-        nodes=nodes,
-        base_locs=original_locations,
-        detail_meta=detail_meta,
-        detail_font_size=detail_font_size,
-        detail_gap_y=detail_gap_y,
-        detail_offset_x=detail_offset_x,
-    )
-
-    nodes_by_ptr = {node.get("ptr"): node for node in nodes if node.get("ptr")}
-    socket_pos = _socket_positions_map(nodes)
-    _draw_links(ax, links, nodes_by_ptr, socket_pos, patches, args.label_links)
-    for node in nodes:
-        _draw_node(
-            ax,
-            node,
-            detail_meta=detail_meta,
-            detail_font_size=detail_font_size,
-            detail_gap_y=detail_gap_y,
-            detail_offset_x=detail_offset_x,
-            draw_sockets=args.draw_sockets,
-            hide_socket_details=args.hide_socket_details,
-            socket_pos=socket_pos,
-            patches=patches,
-        )
-
-    ax.axis("off")
+    if len(materials) == 1:
+        _plot_material(data, _pick_material(data, materials[0]), outs[0] if outs else None, args)
+        return
 
-    fig.tight_layout()
+    # Batch mode (used by read_blend.py): one bad material must not stop the
+    # rest, so report it on stderr (one line each, which read_blend.py relays)
+    # and carry on, failing the run at the end.
+    import sys
 
-    if args.out:
-        blend_stem = _blend_stem_from_export(data, args.json_path)
-        out_dir = _material_outputs_dir(blend_stem)
-        out_name = _clean_output_filename(str(args.out), default_suffix=".png")
-        out_path = out_dir / out_name
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out_path, dpi=args.dpi)
-        print(f"Wrote {out_path}")
-    else:
-        plt.show()
+    failed = 0
+    for material_name, out in zip(materials, outs):
+        try:
+            _plot_material(data, _pick_material(data, material_name), out, args)
+        except (SystemExit, Exception) as exc:
+            failed += 1
+            reason = str(exc) if isinstance(exc, SystemExit) else f"{type(exc).__name__}: {exc}"
+            reason = " ".join(reason.split()) or type(exc).__name__
+            print(f"Skipped graph export for material '{material_name}': {reason}", file=sys.stderr, flush=True)
+    if failed:
+        raise SystemExit(f"{failed} of {len(materials)} graph exports failed.")
 
 
 if __name__ == "__main__":
@@ -12,17 +12,22 @@ with enough context to explain why a material looks the way it does even when
 glTF cannot.
 """
 
+import argparse
+import functools
 import json
+import os
 import shutil
 import subprocess
 import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 from blender_asset_tracer import blendfile
 from blender_asset_tracer.blendfile import iterators
 
-SCHEMA_VERSION = "2.0.0"
+SCHEMA_VERSION = "2.1.0"
 MATERIAL_OUTPUTS_DIRNAME = "Material Outputs"
 
 NON_GLTF_IDNAMES = {
@@ -30,6 +35,7 @@ NON_GLTF_IDNAMES = {
     "ShaderNodeShaderToRGB": "Shader to RGB",
     "ShaderNodeValToRGB": "Color Ramp",
 }
+_NON_GLTF_IDNAME_SET = frozenset(NON_GLTF_IDNAMES)
 
 IN_OUT_MAP = {
     1: "INPUT",
@@ -111,6 +117,23 @@ NODE_MUTED_BIT = 8
 NODE_DO_OUTPUT_BIT = 64
 MA_BL_CULL_BACKFACE = 64
 
+# Material Output socket label -> active_output key for its identifier.
+OUTPUT_SOCKET_KEYS = (
+    ("surface", "surface_socket_identifier"),
+    ("volume", "volume_socket_identifier"),
+    ("displacement", "displacement_socket_identifier"),
+)
+
+# Lookup sentinel for mappings whose values may legitimately be falsy.
+_MISSING = object()
+
+# str.translate table for ASCII filename characters: alphanumerics and -_. are
+# kept, everything else becomes "_".
+_FILENAME_ASCII_TABLE = {
+    code: code if (chr(code).isalnum() or chr(code) in "-_.") else ord("_")
+    for code in range(128)
+}
+
 
 def as_str(value):
     """
@@ -125,8 +148,10 @@ def as_str(value):
     returns:
         Decoded str if value is bytes, otherwise value unchanged.
     """
-    if isinstance(value, bytes):
-        return value.decode("utf-8", errors="replace").rstrip("\x00")
+    # BAT hands back exact bytes objects, so the type check needs no MRO walk.
+    # Trailing NULs are stripped before decoding so only the text is decoded.
+    if type(value) is bytes:
+        return value.rstrip(b"\x00").decode("utf-8", errors="replace")
     return value
 
 
@@ -226,13 +251,23 @@ def _iter_listbase(head):
         head: First pointer in a Blender listbase.
     returns:
         Iterator of listbase entries (empty iterator if head is null/invalid).
+        The walk stops early at the first next pointer that cannot be read.
     """
     if not head:
-        return iter(())
-    try:
-        return iterators.listbase(head)
-    except Exception:
-        return iter(())
+        return
+    # Same walk as iterators.listbase, with get() called directly and the
+    # (file-wide) pointer dereference bound once for the whole list.
+    dereference_pointer = head.bfile.dereference_pointer
+    block = head
+    while block:
+        yield block
+        try:
+            next_ptr = block.get(b"next")
+            if not next_ptr:
+                return
+            block = dereference_pointer(next_ptr)
+        except Exception:
+            return
 
 
 def _safe_filename_part(value: str) -> str:
@@ -248,12 +283,18 @@ def _safe_filename_part(value: str) -> str:
     returns:
         Sanitized text safe to embed in a filename.
     """
-    cleaned = "".join(char if (char.isalnum() or char in ("-", "_", ".")) else "_" for char in value.strip())
+    stripped = value.strip()
+    if stripped.isascii():
+        cleaned = stripped.translate(_FILENAME_ASCII_TABLE)
+    else:
+        # Non-ASCII letters are kept (isalnum), so they need the per-char check.
+        cleaned = "".join(char if (char.isalnum() or char in ("-", "_", ".")) else "_" for char in stripped)
     cleaned = cleaned.strip("._")
     return cleaned or "material"
 
 
-def _python_command_candidates() -> list[list[str]]:
+@functools.lru_cache(maxsize=1)
+def _python_command_candidates() -> tuple[tuple[str, ...], ...]:
     """
     Build a prioritized list of Python commands for running plot_node_tree.py.
 
@@ -265,24 +306,87 @@ def _python_command_candidates() -> list[list[str]]:
     inputs:
         none
     returns:
-        List of command prefixes (each prefix is a list of argv items).
+        Tuple of command prefixes (each prefix is a tuple of argv items).
+        Cached, since the PATH lookups give the same answer for the whole run.
     """
-    commands: list[list[str]] = [[sys.executable]]
+    commands: list[tuple[str, ...]] = [(sys.executable,)]
     if shutil.which("py"):
-        commands.append(["py", "-3"])
+        commands.append(("py", "-3"))
     if shutil.which("python"):
-        commands.append(["python"])
+        commands.append(("python",))
 
     # Remove duplicates while preserving order.
-    unique: list[list[str]] = []
-    seen: set[tuple[str, ...]] = set()
-    for cmd in commands:
-        key = tuple(cmd)
-        if key in seen:
+    return tuple(dict.fromkeys(commands))
+
+
+@functools.lru_cache(maxsize=None)
+def _plot_python_command() -> tuple[str, ...] | None:
+    """
+    Return the first Python command that can import matplotlib.
+
+    Each candidate from _python_command_candidates is probed with a cheap
+    `-c "import matplotlib"` run; the answer is cached for the process.
+
+    inputs:
+        none
+    returns:
+        Command prefix (tuple of argv items), or None when no candidate has matplotlib.
+    """
+    for python_cmd in _python_command_candidates():
+        try:
+            probe = subprocess.run(
+                [*python_cmd, "-c", "import matplotlib"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
             continue
-        seen.add(key)
-        unique.append(cmd)
-    return unique
+        if probe.returncode == 0:
+            return python_cmd
+    return None
+
+
+def _run_plot_batch(python_cmd, plot_script: Path, json_path: Path, plots: list[tuple[str, str]]) -> dict[str, str]:
+    """
+    Run one plot_node_tree.py invocation covering one or more materials.
+
+    In batch mode plot_node_tree.py reports each material it could not export
+    on stderr as "Skipped graph export for material '<name>': <reason>". If
+    the run fails without such a line (a crash, a bad argument, or a single
+    material), every material of the batch not already reported is blamed
+    with the last stderr line, as when each material had its own process.
+
+    inputs:
+        python_cmd: Command prefix from _plot_python_command.
+        plot_script: Path to plot_node_tree.py.
+        json_path: Path to the exported JSON.
+        plots: (material_name, output_filename) pairs for this batch.
+    returns:
+        Map of material name -> failure reason for materials that were not
+        exported (empty when the whole batch succeeded). stdout is inherited.
+    """
+    command = [*python_cmd, str(plot_script), str(json_path)]
+    for material_name, out_name in plots:
+        command += ["--material", material_name, "--out", out_name]
+    completed = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+
+    error_lines = (completed.stderr or "").strip().splitlines()
+    failures: dict[str, str] = {}
+    for line in error_lines:
+        for material_name, _ in plots:
+            prefix = f"Skipped graph export for material '{material_name}': "
+            if line.startswith(prefix):
+                failures[material_name] = line[len(prefix):]
+                break
+
+    # A batch that ran to the end exits with "<n> of <m> graph exports failed."
+    # after reporting each failure; anything else means it stopped early.
+    finished = bool(error_lines) and error_lines[-1].endswith("graph exports failed.")
+    if completed.returncode != 0 and not finished:
+        reason = error_lines[-1] if error_lines else "plot_node_tree.py returned an unknown error."
+        for material_name, _ in plots:
+            failures.setdefault(material_name, reason)
+    return failures
 
 
 def render_graph_exports(json_path: Path, materials: list[dict], blend_stem: str) -> None:
@@ -309,9 +413,14 @@ def render_graph_exports(json_path: Path, materials: list[dict], blend_stem: str
     if not materials_with_nodes:
         return
 
+    python_cmd = _plot_python_command()
+    if python_cmd is None:
+        print("Skipped graph export: no Python runtime with matplotlib was found.")
+        return
+
     multiple_graphs = len(materials_with_nodes) > 1
     used_filenames: dict[str, int] = {}
-    python_commands = _python_command_candidates()
+    plots: list[tuple[str, str]] = []
 
     for material in materials_with_nodes:
         material_name = (material.get("name") or "").strip() or "Material"
@@ -324,32 +433,29 @@ def render_graph_exports(json_path: Path, materials: list[dict], blend_stem: str
         used_filenames[base_name] = suffix_index + 1
         unique_name = f"{base_name}_{suffix_index}.png" if suffix_index else f"{base_name}.png"
 
-        command_tail = [
-            str(plot_script),
-            str(json_path),
-            "--material",
-            material_name,
-            "--out",
-            unique_name,
-        ]
-
-        last_error = ""
-        for python_cmd in python_commands:
-            cmd = [*python_cmd, *command_tail]
-            completed = subprocess.run(cmd, capture_output=True, text=True)
-            if completed.returncode == 0:
-                if completed.stdout.strip():
-                    print(completed.stdout.strip())
-                break
-            error_text = (completed.stderr or completed.stdout or "").strip()
-            if error_text:
-                last_error = error_text
-        else:
-            print(f"Skipped graph export for material '{material_name}':")
-            if last_error:
-                print(last_error.splitlines()[-1])
-            else:
-                print("plot_node_tree.py returned an unknown error.")
+        plots.append((material_name, unique_name))
+
+    # Each plot_node_tree.py run renders a share of the materials, so
+    # interpreter startup and the matplotlib import are paid once per worker
+    # while the renders (single-threaded each) proceed in parallel. Status
+    # lines go straight to our stdout; failures come back per material.
+    worker_count = min(len(plots), os.cpu_count() or 1, 8)
+    batches = [plots[start::worker_count] for start in range(worker_count)]
+    sys.stdout.flush()
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        batch_failures = list(
+            executor.map(functools.partial(_run_plot_batch, python_cmd, plot_script, json_path), batches)
+        )
+
+    failures: dict[str, str] = {}
+    for batch_failure in batch_failures:
+        failures.update(batch_failure)
+    for material_name, _ in plots:
+        reason = failures.pop(material_name, None)
+        if reason is None:
+            continue
+        print(f"Skipped graph export for material '{material_name}':")
+        print(reason)
 
 
 def id_name(block) -> str:
@@ -387,6 +493,10 @@ def normalize_value(value):
     if isinstance(value, bytes):
         return as_str(value)
     if isinstance(value, (list, tuple)):
+        # Vector/color defaults are plain float arrays; copy them without the
+        # per-item recursive dispatch.
+        if all(type(item) is float for item in value):
+            return list(value)
         return [normalize_value(item) for item in value]
     if isinstance(value, bool):
         return value
@@ -413,8 +523,9 @@ def enum_or_unknown(code, mapping, enum_name, warnings):
     returns:
         Mapped name string (or UNKNOWN_<code> if unmapped).
     """
-    if code in mapping:
-        return mapping[code]
+    name = mapping.get(code, _MISSING)
+    if name is not _MISSING:
+        return name
     warnings.append(f"Unknown {enum_name} enum value: {code}")
     return f"UNKNOWN_{code}"
 
@@ -432,8 +543,7 @@ def blender_version_string(blend_file) -> str:
     returns:
         Version string like 4.2.66.
     """
-    major = int(getattr(blend_file.header, "version", 0) // 100)
-    minor = int(getattr(blend_file.header, "version", 0) % 100)
+    major, minor = divmod(int(getattr(blend_file.header, "version", 0) or 0), 100)
     patch = int(getattr(blend_file, "file_subversion", 0))
     return f"{major}.{minor}.{patch}"
 
@@ -482,8 +592,9 @@ def decode_socket_default(sock):
     if not default_ptr:
         return decoded, subtype_code
 
+    get = default_ptr.get
     try:
-        decoded["default"] = normalize_value(default_ptr.get(b"value"))
+        decoded["default"] = normalize_value(get(b"value"))
     except Exception:
         pass
 
@@ -495,16 +606,20 @@ def decode_socket_default(sock):
         (b"softmin", "soft_min"),
         (b"softmax", "soft_max"),
     )
+    # Default structs differ per socket type; checking the DNA field table
+    # first skips the KeyError (and its message listing every field) that
+    # get() raises for each key the struct lacks.
+    has_field = default_ptr.dna_type.has_field
     for dna_key, json_key in key_pairs:
-        if json_key in decoded:
+        if json_key in decoded or not has_field(dna_key):
             continue
         try:
-            decoded[json_key] = normalize_value(default_ptr.get(dna_key))
+            decoded[json_key] = normalize_value(get(dna_key))
         except Exception:
             pass
 
     try:
-        subtype_code = int(default_ptr.get(b"subtype"))
+        subtype_code = int(get(b"subtype"))
     except Exception:
         subtype_code = None
 
@@ -539,20 +654,24 @@ def extract_socket(sock, linked_socket_ptrs, link_counts):
 
     inputs:
         sock: bNodeSocket block.
-        linked_socket_ptrs: Set of socket ptrs that participate in links.
+        linked_socket_ptrs: Set-like collection of socket ptrs that participate in links.
         link_counts: Map of socket ptr -> number of links touching it.
     returns:
         Socket dict including identifiers, defaults, and link metadata.
     """
-    ptr = getattr(sock, "addr_old", None)
-    sock_type = sock.get(b"type", None)
+    try:
+        ptr = sock.addr_old
+    except AttributeError:
+        ptr = None
+    get = sock.get
+    sock_type = get(b"type", None)
 
     default_data, subtype_code = decode_socket_default(sock)
-    in_out_raw = sock.get(b"in_out", None)
+    in_out_raw = get(b"in_out", None)
     info = {
         "ptr": ptr,
-        "name": as_str(sock.get(b"name", as_str=True)),
-        "identifier": as_str(sock.get(b"identifier", as_str=True)),
+        "name": as_str(get(b"name", as_str=True)),
+        "identifier": as_str(get(b"identifier", as_str=True)),
         "type": sock_type,
         "subtype": socket_subtype_name(sock_type, subtype_code),
         "in_out": IN_OUT_MAP.get(in_out_raw, in_out_raw),
@@ -688,67 +807,128 @@ def extract_linked_image(node, blend_file):
     }
 
 
-def extract_node_properties(node, idname, warnings):
+def _toon_properties(node, warnings):
     """
-    Extract node-type-specific properties required by the schema.
-
-    Sockets and links describe most nodes, but some Blender nodes carry extra
-    settings that matter for non-glTF behavior (toon component, mix blend type,
-    clamp flags, ramp interpolation modes). Exporting these makes a Blender-to-Godot
-    conversion step more faithful.
+    Extract Toon BSDF properties (the diffuse/glossy component).
 
     inputs:
-        node: bNode block.
-        idname: Node type string (such as ShaderNodeMix).
+        node: ShaderNodeBsdfToon bNode block.
         warnings: Warning sink for unknown enum values.
     returns:
-        Properties dict (empty if none apply).
+        (properties, None); Toon nodes have no color ramp.
     """
-    properties = {}
-
-    if idname == "ShaderNodeBsdfToon":
-        component_code = int(node.get(b"custom1", 0))
-        properties["component"] = enum_or_unknown(
+    component_code = int(node.get(b"custom1", 0))
+    properties = {
+        "component": enum_or_unknown(
             component_code,
             TOON_COMPONENT_MAP,
             "ToonBSDF.component",
             warnings,
-        )
+        ),
+    }
+    return properties, None
 
-    if idname == "ShaderNodeMixRGB":
-        blend_code = int(node.get(b"custom1", 0))
-        properties["blend_type"] = enum_or_unknown(
+
+def _mix_rgb_properties(node, warnings):
+    """
+    Extract legacy MixRGB properties (blend type and clamp).
+
+    inputs:
+        node: ShaderNodeMixRGB bNode block.
+        warnings: Warning sink for unknown enum values.
+    returns:
+        (properties, None); MixRGB nodes have no color ramp.
+    """
+    blend_code = int(node.get(b"custom1", 0))
+    properties = {
+        "blend_type": enum_or_unknown(
             blend_code,
             MIX_BLEND_TYPE_MAP,
             "MixRGB.blend_type",
             warnings,
+        ),
+        "use_clamp": bool(node.get(b"custom2", 0)),
+    }
+    return properties, None
+
+
+def _mix_properties(node, warnings):
+    """
+    Extract Mix node properties from its NodeShaderMix storage.
+
+    inputs:
+        node: ShaderNodeMix bNode block.
+        warnings: Warning sink for unknown enum values.
+    returns:
+        (properties, None); properties is empty without NodeShaderMix storage.
+    """
+    properties = {}
+    try:
+        storage = node.get_pointer(b"storage")
+    except Exception:
+        storage = None
+    if storage and storage.dna_type_name == "NodeShaderMix":
+        blend_code = int(storage.get(b"blend_type", 0))
+        properties["blend_type"] = enum_or_unknown(
+            blend_code,
+            MIX_BLEND_TYPE_MAP,
+            "Mix.blend_type",
+            warnings,
         )
-        properties["use_clamp"] = bool(node.get(b"custom2", 0))
+        properties["use_clamp"] = bool(storage.get(b"clamp_result", 0) or storage.get(b"clamp_factor", 0))
+    return properties, None
 
-    if idname == "ShaderNodeMix":
-        try:
-            storage = node.get_pointer(b"storage")
-        except Exception:
-            storage = None
-        if storage and storage.dna_type_name == "NodeShaderMix":
-            blend_code = int(storage.get(b"blend_type", 0))
-            properties["blend_type"] = enum_or_unknown(
-                blend_code,
-                MIX_BLEND_TYPE_MAP,
-                "Mix.blend_type",
-                warnings,
-            )
-            properties["use_clamp"] = bool(storage.get(b"clamp_result", 0) or storage.get(b"clamp_factor", 0))
 
-    if idname == "ShaderNodeValToRGB":
-        ramp_settings, _ = extract_color_ramp(node, warnings)
-        if ramp_settings:
-            properties["ramp_settings"] = ramp_settings
+def _color_ramp_properties(node, warnings):
+    """
+    Extract ColorRamp settings and points with a single ColorBand read.
+
+    inputs:
+        node: ShaderNodeValToRGB bNode block.
+        warnings: Warning sink for unknown enum values.
+    returns:
+        (properties, color_ramp_points) from extract_color_ramp.
+    """
+    properties = {}
+    ramp_settings, ramp_points = extract_color_ramp(node, warnings)
+    if ramp_settings:
+        properties["ramp_settings"] = ramp_settings
+    return properties, ramp_points
+
+
+# idname -> extractor for node types that carry settings beyond their sockets.
+NODE_PROPERTY_EXTRACTORS = {
+    "ShaderNodeBsdfToon": _toon_properties,
+    "ShaderNodeMixRGB": _mix_rgb_properties,
+    "ShaderNodeMix": _mix_properties,
+    "ShaderNodeValToRGB": _color_ramp_properties,
+}
 
-    return properties
 
+def extract_node_properties(node, idname, warnings):
+    """
+    Extract node-type-specific properties required by the schema.
 
-def extract_node(node, blend_file, linked_socket_ptrs, link_counts, warnings):
+    Sockets and links describe most nodes, but some Blender nodes carry extra
+    settings that matter for non-glTF behavior (toon component, mix blend type,
+    clamp flags, ramp interpolation modes). Exporting these makes a Blender-to-Godot
+    conversion step more faithful.
+
+    inputs:
+        node: bNode block.
+        idname: Node type string (such as ShaderNodeMix).
+        warnings: Warning sink for unknown enum values.
+    returns:
+        (properties, color_ramp_points): properties is empty if none apply;
+        color_ramp_points is only set for ShaderNodeValToRGB.
+    """
+    extractor = NODE_PROPERTY_EXTRACTORS.get(idname)
+    if extractor is None:
+        return {}, None
+    return extractor(node, warnings)
+
+
+def extract_node(node, blend_file, linked_socket_ptrs, link_counts, warnings, linked_id_cache):
     """
     Serialize a node including sockets, linked assets, and special node data.
 
@@ -760,16 +940,21 @@ def extract_node(node, blend_file, linked_socket_ptrs, link_counts, warnings):
     inputs:
         node: bNode block.
         blend_file: Opened BAT BlendFile.
-        linked_socket_ptrs: Set of linked socket ptrs.
+        linked_socket_ptrs: Set-like collection of linked socket ptrs.
         link_counts: Map of socket ptr -> number of links touching it.
         warnings: Warning sink for unknown enum values.
+        linked_id_cache: ID ptr -> (linked_id, linked_image), shared across the export.
     returns:
         (node_dict, node_flag) where node_flag is the raw bNode.flag bits.
     """
     idname = as_str(node.get(b"idname", as_str=True))
     node_flag = int(node.get(b"flag", 0))
+    try:
+        ptr = node.addr_old
+    except AttributeError:
+        ptr = None
     node_data = {
-        "ptr": getattr(node, "addr_old", None),
+        "ptr": ptr,
         "idname": idname,
         "ui_name": as_str(node.get(b"name", as_str=True)),
         "label": as_str(node.get(b"label", as_str=True)),
@@ -787,13 +972,20 @@ def extract_node(node, blend_file, linked_socket_ptrs, link_counts, warnings):
     except Exception:
         linked_id_ptr = 0
     if linked_id_ptr:
-        linked_ref = ptr_to_ref(blend_file, linked_id_ptr)
+        # The same image (or other ID) is typically used by many nodes and
+        # materials; its reference and image metadata only need reading once.
+        cached = linked_id_cache.get(linked_id_ptr)
+        if cached is None:
+            linked_ref = ptr_to_ref(blend_file, linked_id_ptr)
+            linked_image = None
+            if linked_ref and linked_ref.get("code") == "IM":
+                linked_image = extract_linked_image(node, blend_file)
+            cached = linked_id_cache[linked_id_ptr] = (linked_ref, linked_image)
+        linked_ref, linked_image = cached
         if linked_ref:
             node_data["linked_id"] = linked_ref
-            if linked_ref.get("code") == "IM":
-                linked_image = extract_linked_image(node, blend_file)
-                if linked_image:
-                    node_data["linked_image"] = linked_image
+            if linked_image:
+                node_data["linked_image"] = linked_image
 
     try:
         inputs_head = node.get_pointer((b"inputs", b"first"))
@@ -815,67 +1007,102 @@ def extract_node(node, blend_file, linked_socket_ptrs, link_counts, warnings):
     except Exception:
         pass
 
-    properties = extract_node_properties(node, idname=idname, warnings=warnings)
+    properties, color_ramp_points = extract_node_properties(node, idname=idname, warnings=warnings)
     if properties:
         node_data["properties"] = properties
-
-    if idname == "ShaderNodeValToRGB":
-        _, color_ramp_points = extract_color_ramp(node, warnings)
-        if color_ramp_points:
-            node_data["color_ramp"] = color_ramp_points
+    if color_ramp_points:
+        node_data["color_ramp"] = color_ramp_points
 
     return node_data, node_flag
 
 
-def extract_link(link, blend_file):
+def _link_node_ref(ptr, block_from_addr, cache):
     """
-    Serialize a bNodeLink into JSON-friendly dict form.
+    Resolve a link endpoint node pointer to its summary dict, memoized per tree.
 
-    Links connect output sockets to input sockets. Capturing both ends (node and
-    socket identifiers) supports plotting the graph and lets downstream code trace
-    which branch drives the active output when mapping to Godot properties.
+    Several links usually start or end at the same node, so each node block is
+    read once per node tree instead of once per link end.
 
     inputs:
-        link: bNodeLink block.
-        blend_file: Opened BAT BlendFile.
+        ptr: Node pointer from a bNodeLink (0 if unset).
+        block_from_addr: The BlendFile's address -> block mapping.
+        cache: Dict of ptr -> summary (or None) shared across a tree's links.
     returns:
-        Link dict with from/to node and socket references.
+        Dict with ptr, ui_name, idname, type, or None if unresolvable.
     """
-    def node_info(ptr):
-        block = blend_file.block_from_addr.get(ptr) if ptr else None
-        if not block:
-            return None
-        return {
+    if ptr in cache:
+        return cache[ptr]
+    block = block_from_addr.get(ptr) if ptr else None
+    info = None
+    if block:
+        info = {
             "ptr": ptr,
             "ui_name": as_str(block.get(b"name", as_str=True)),
             "idname": as_str(block.get(b"idname", as_str=True)),
             "type": block.get(b"type", None),
         }
+    cache[ptr] = info
+    return info
+
+
+def _link_socket_ref(ptr, block_from_addr, cache):
+    """
+    Resolve a link endpoint socket pointer to its summary dict, memoized per tree.
 
-    def socket_info(ptr):
-        block = blend_file.block_from_addr.get(ptr) if ptr else None
-        if not block:
-            return None
+    inputs:
+        ptr: Socket pointer from a bNodeLink (0 if unset).
+        block_from_addr: The BlendFile's address -> block mapping.
+        cache: Dict of ptr -> summary (or None) shared across a tree's links.
+    returns:
+        Dict with ptr, name, identifier, in_out, type, or None if unresolvable.
+    """
+    if ptr in cache:
+        return cache[ptr]
+    block = block_from_addr.get(ptr) if ptr else None
+    info = None
+    if block:
         in_out_raw = block.get(b"in_out", None)
-        return {
+        info = {
             "ptr": ptr,
             "name": as_str(block.get(b"name", as_str=True)),
             "identifier": as_str(block.get(b"identifier", as_str=True)),
             "in_out": IN_OUT_MAP.get(in_out_raw, in_out_raw),
             "type": block.get(b"type", None),
         }
+    cache[ptr] = info
+    return info
 
-    from_node_ptr = link.get(b"fromnode", 0)
-    to_node_ptr = link.get(b"tonode", 0)
-    from_socket_ptr = link.get(b"fromsock", 0)
-    to_socket_ptr = link.get(b"tosock", 0)
 
+def extract_link(link, blend_file, node_info_cache, socket_info_cache, from_socket_ptr, to_socket_ptr):
+    """
+    Serialize a bNodeLink into JSON-friendly dict form.
+
+    Links connect output sockets to input sockets. Capturing both ends (node and
+    socket identifiers) supports plotting the graph and lets downstream code trace
+    which branch drives the active output when mapping to Godot properties.
+
+    inputs:
+        link: bNodeLink block.
+        blend_file: Opened BAT BlendFile.
+        node_info_cache: Node ptr -> summary dict, shared across a tree's links.
+        socket_info_cache: Socket ptr -> summary dict, shared across a tree's links.
+        from_socket_ptr: The link's fromsock pointer (already read by the caller).
+        to_socket_ptr: The link's tosock pointer (already read by the caller).
+    returns:
+        Link dict with from/to node and socket references. Endpoint dicts are
+        shared between links that touch the same node or socket.
+    """
+    block_from_addr = blend_file.block_from_addr
+    try:
+        ptr = link.addr_old
+    except AttributeError:
+        ptr = None
     return {
-        "ptr": getattr(link, "addr_old", None),
-        "from_node": node_info(from_node_ptr),
-        "from_socket": socket_info(from_socket_ptr),
-        "to_node": node_info(to_node_ptr),
-        "to_socket": socket_info(to_socket_ptr),
+        "ptr": ptr,
+        "from_node": _link_node_ref(link.get(b"fromnode", 0), block_from_addr, node_info_cache),
+        "from_socket": _link_socket_ref(from_socket_ptr, block_from_addr, socket_info_cache),
+        "to_node": _link_node_ref(link.get(b"tonode", 0), block_from_addr, node_info_cache),
+        "to_socket": _link_socket_ref(to_socket_ptr, block_from_addr, socket_info_cache),
         "flag": link.get(b"flag", None),
     }
 
@@ -924,31 +1151,22 @@ def extract_material_settings(material_block, warnings):
     }
 
 
-def extract_active_output(node_entries, output_node_flags):
+def extract_active_output(active_node):
     """
-    Determine the active Material Output node and its socket identifiers.
+    Summarize the active Material Output node and its socket identifiers.
 
     Materials can contain multiple output nodes; Blender marks one as the "active"
     output. Picking the right one matters when deciding what should drive the
-    Godot material's surface/volume/displacement equivalents.
+    Godot material's surface/volume/displacement equivalents. _collect_nodes
+    makes that pick while it serializes the nodes.
 
     inputs:
-        node_entries: List of serialized node dicts.
-        output_node_flags: Map of output node ptr -> raw flag bits.
+        active_node: Serialized dict of the active output node, or None.
     returns:
         (active_output, socket_lookup) where active_output may be None.
     """
-    output_nodes = [node for node in node_entries if node.get("idname") == "ShaderNodeOutputMaterial"]
-    if not output_nodes:
-        return None, {}
-
-    active_node = None
-    for node in output_nodes:
-        if output_node_flags.get(node.get("ptr"), 0) & NODE_DO_OUTPUT_BIT:
-            active_node = node
-            break
     if not active_node:
-        active_node = output_nodes[0]
+        return None, {}
 
     active_info = {"node_ptr": active_node.get("ptr")}
     input_sockets = active_node.get("inputs", [])
@@ -959,17 +1177,21 @@ def extract_active_output(node_entries, output_node_flags):
         if socket_name:
             socket_by_name[socket_name] = socket_identifier
         if socket_identifier:
-            socket_by_name[str(socket_identifier).strip().lower()] = socket_identifier
+            # Identifiers usually match the name (Surface/Surface); the entry
+            # written above already covers that key.
+            identifier_key = str(socket_identifier).strip().lower()
+            if identifier_key and identifier_key != socket_name:
+                socket_by_name[identifier_key] = socket_identifier
 
-    for label in ("surface", "volume", "displacement"):
+    for label, info_key in OUTPUT_SOCKET_KEYS:
         identifier = socket_by_name.get(label)
         if identifier:
-            active_info[f"{label}_socket_identifier"] = identifier
+            active_info[info_key] = identifier
 
     return active_info, socket_by_name
 
 
-def extract_output_targets(active_ptr, links):
+def extract_output_targets(active_ptr, links_by_to_node):
     """
     Build mapping of output socket target -> upstream connection.
 
@@ -979,7 +1201,8 @@ def extract_output_targets(active_ptr, links):
 
     inputs:
         active_ptr: Ptr of the active output node.
-        links: List of serialized link dicts.
+        links_by_to_node: Map of destination node ptr -> serialized link dicts
+            (in link order), from _collect_links.
     returns:
         Dict keyed by output socket identifier/name (lowercase) to
         {from_node_ptr, from_socket_identifier}.
@@ -988,10 +1211,7 @@ def extract_output_targets(active_ptr, links):
         return {}
 
     targets = {}
-    for link in links:
-        to_node = link.get("to_node") or {}
-        if to_node.get("ptr") != active_ptr:
-            continue
+    for link in links_by_to_node.get(active_ptr, ()):
         to_socket = link.get("to_socket") or {}
         from_node = link.get("from_node") or {}
         from_socket = link.get("from_socket") or {}
@@ -1005,6 +1225,32 @@ def extract_output_targets(active_ptr, links):
     return targets
 
 
+def _reachable_node_ptrs(active_ptr, links_by_to_node):
+    """
+    Find the nodes that feed the active output, directly or indirectly.
+
+    Walks links backwards from the active output node. Nodes outside this set
+    (orphan islands, leftovers from editing) do not affect the rendered
+    material, so a Godot conversion step can skip them.
+
+    inputs:
+        active_ptr: Ptr of the active output node.
+        links_by_to_node: Map of destination node ptr -> serialized link dicts.
+    returns:
+        Set of node ptrs reachable from the active output (including it).
+    """
+    reachable = {active_ptr}
+    pending = [active_ptr]
+    while pending:
+        for link in links_by_to_node.get(pending.pop(), ()):
+            from_node = link.get("from_node")
+            from_ptr = from_node.get("ptr") if from_node else None
+            if from_ptr and from_ptr not in reachable:
+                reachable.add(from_ptr)
+                pending.append(from_ptr)
+    return reachable
+
+
 def _collect_links(node_tree, blend_file):
     """
     Collect serialized links and link metadata for a node tree.
@@ -1018,31 +1264,42 @@ def _collect_links(node_tree, blend_file):
         node_tree: bNodeTree block.
         blend_file: Opened BAT BlendFile.
     returns:
-        Tuple (linked_socket_ptrs, link_counts, links).
+        Tuple (linked_socket_ptrs, link_counts, links, links_by_to_node), where
+        link_counts is a Counter, linked_socket_ptrs is its set-like keys view,
+        and links_by_to_node groups the serialized links by destination node ptr.
     """
-    linked_socket_ptrs = set()
-    link_counts = {}
+    linked_ptrs = []
     links = []
+    links_by_to_node = defaultdict(list)
+    node_info_cache = {}
+    socket_info_cache = {}
 
     links_head = _first_pointer(node_tree, ((b"links", b"first"),))
     for link in _iter_listbase(links_head):
-        try:
-            from_socket_ptr = link.get(b"fromsock", 0)
-            to_socket_ptr = link.get(b"tosock", 0)
-            if from_socket_ptr:
-                linked_socket_ptrs.add(from_socket_ptr)
-                link_counts[from_socket_ptr] = link_counts.get(from_socket_ptr, 0) + 1
-            if to_socket_ptr:
-                linked_socket_ptrs.add(to_socket_ptr)
-                link_counts[to_socket_ptr] = link_counts.get(to_socket_ptr, 0) + 1
-        except Exception:
-            pass
-        links.append(extract_link(link, blend_file))
+        # Read each socket pointer once: it feeds both the link counts and the
+        # serialized link.
+        from_socket_ptr = link.get(b"fromsock", 0)
+        to_socket_ptr = link.get(b"tosock", 0)
+        if from_socket_ptr:
+            linked_ptrs.append(from_socket_ptr)
+        if to_socket_ptr:
+            linked_ptrs.append(to_socket_ptr)
+        link_info = extract_link(
+            link, blend_file, node_info_cache, socket_info_cache, from_socket_ptr, to_socket_ptr
+        )
+        links.append(link_info)
+        to_node = link_info.get("to_node")
+        if to_node and to_node.get("ptr"):
+            links_by_to_node[to_node["ptr"]].append(link_info)
 
-    return linked_socket_ptrs, link_counts, links
+    # Counting the collected ptrs in one Counter() call takes its C counting
+    # path. Every counted socket is linked, so the Counter's keys view doubles
+    # as the linked-socket set without building a second collection.
+    link_counts = Counter(linked_ptrs)
+    return link_counts.keys(), link_counts, links, links_by_to_node
 
 
-def _collect_nodes(node_tree, blend_file, linked_socket_ptrs, link_counts, warnings):
+def _collect_nodes(node_tree, blend_file, linked_socket_ptrs, link_counts, warnings, linked_id_cache):
     """
     Collect serialized nodes and node-tree summary groups.
 
@@ -1053,15 +1310,19 @@ def _collect_nodes(node_tree, blend_file, linked_socket_ptrs, link_counts, warni
     inputs:
         node_tree: bNodeTree block.
         blend_file: Opened BAT BlendFile.
-        linked_socket_ptrs: Set of linked socket ptrs.
+        linked_socket_ptrs: Set-like collection of linked socket ptrs.
         link_counts: Socket ptr -> link count mapping.
         warnings: Warning sink for unknown enum values.
+        linked_id_cache: ID ptr -> (linked_id, linked_image), shared across the export.
     returns:
-        Tuple (all_nodes, non_gltf_nodes, output_node_flags).
+        Tuple (all_nodes, non_gltf_nodes, active_output_node). The active
+        output node is the first ShaderNodeOutputMaterial flagged
+        NODE_DO_OUTPUT, else the first one found, else None.
     """
     all_nodes = []
     non_gltf_nodes = []
-    output_node_flags = {}
+    first_output_node = None
+    flagged_output_node = None
 
     nodes_head = _first_pointer(node_tree, ((b"nodes", b"first"),))
     for raw_node in _iter_listbase(nodes_head):
@@ -1071,27 +1332,34 @@ def _collect_nodes(node_tree, blend_file, linked_socket_ptrs, link_counts, warni
             linked_socket_ptrs=linked_socket_ptrs,
             link_counts=link_counts,
             warnings=warnings,
+            linked_id_cache=linked_id_cache,
         )
         all_nodes.append(node_info)
-
-        if node_info.get("idname") == "ShaderNodeOutputMaterial" and node_info.get("ptr"):
-            output_node_flags[node_info["ptr"]] = node_flag
-
-        node_kind = NON_GLTF_IDNAMES.get(node_info.get("idname"))
-        if node_kind:
+        idname = node_info.get("idname")
+        ptr = node_info.get("ptr")
+
+        if idname == "ShaderNodeOutputMaterial":
+            if first_output_node is None:
+                first_output_node = node_info
+            if flagged_output_node is None and ptr and node_flag & NODE_DO_OUTPUT_BIT:
+                flagged_output_node = node_info
+
+        # Most nodes are not in the (small) non-glTF table; a set membership
+        # test rejects them without a method call.
+        if idname in _NON_GLTF_IDNAME_SET:
             non_gltf_nodes.append(
                 {
-                    "ptr": node_info.get("ptr"),
-                    "idname": node_info.get("idname"),
+                    "ptr": ptr,
+                    "idname": idname,
                     "ui_name": node_info.get("ui_name"),
-                    "kind": node_kind,
+                    "kind": NON_GLTF_IDNAMES[idname],
                 }
             )
 
-    return all_nodes, non_gltf_nodes, output_node_flags
+    return all_nodes, non_gltf_nodes, flagged_output_node or first_output_node
 
 
-def _build_node_tree_entry(node_tree, blend_file, warnings):
+def _build_node_tree_entry(node_tree, blend_file, warnings, linked_id_cache):
     """
     Build a serialized node-tree payload for one material.
 
@@ -1103,6 +1371,7 @@ def _build_node_tree_entry(node_tree, blend_file, warnings):
         node_tree: bNodeTree block from a material.
         blend_file: Opened BAT BlendFile.
         warnings: Warning sink for unknown enum values.
+        linked_id_cache: ID ptr -> (linked_id, linked_image), shared across the export.
     returns:
         Node-tree dict matching the existing JSON schema.
     """
@@ -1111,33 +1380,41 @@ def _build_node_tree_entry(node_tree, blend_file, warnings):
         "id_code": as_str(node_tree.id_name[:2]),
     }
 
-    linked_socket_ptrs, link_counts, links = _collect_links(node_tree, blend_file)
+    linked_socket_ptrs, link_counts, links, links_by_to_node = _collect_links(node_tree, blend_file)
     if links:
         node_tree_entry["links"] = links
 
-    all_nodes, non_gltf_nodes, output_node_flags = _collect_nodes(
+    all_nodes, non_gltf_nodes, active_output_node = _collect_nodes(
         node_tree,
         blend_file,
         linked_socket_ptrs,
         link_counts,
         warnings,
+        linked_id_cache,
     )
     if all_nodes:
         node_tree_entry["nodes"] = all_nodes
     if non_gltf_nodes:
         node_tree_entry["non_gltf_nodes"] = non_gltf_nodes
 
-    active_output, _ = extract_active_output(all_nodes, output_node_flags)
-    if active_output:
+    if active_output_node:
+        # active_output is the exported summary; the ptr comes straight from
+        # the node dict _collect_nodes already picked.
+        active_output, _ = extract_active_output(active_output_node)
         node_tree_entry["active_output"] = active_output
-        output_targets = extract_output_targets(active_output.get("node_ptr"), links)
-        if output_targets:
-            node_tree_entry["output_targets"] = output_targets
+        active_ptr = active_output_node.get("ptr")
+        if active_ptr:
+            reachable = _reachable_node_ptrs(active_ptr, links_by_to_node)
+            for node_info in all_nodes:
+                node_info["reachable"] = node_info.get("ptr") in reachable
+            output_targets = extract_output_targets(active_ptr, links_by_to_node)
+            if output_targets:
+                node_tree_entry["output_targets"] = output_targets
 
     return node_tree_entry
 
 
-def _build_material_entry(material_block, blend_file, warnings):
+def _build_material_entry(material_block, blend_file, warnings, linked_id_cache, node_tree_cache):
     """
     Build the serialized material payload for one Blender material block.
 
@@ -1149,6 +1426,8 @@ def _build_material_entry(material_block, blend_file, warnings):
         material_block: Material datablock (MA).
         blend_file: Opened BAT BlendFile.
         warnings: Warning sink for unknown enum values.
+        linked_id_cache: ID ptr -> (linked_id, linked_image), shared across the export.
+        node_tree_cache: Node-tree ptr -> serialized node tree, shared across the export.
     returns:
         Material dict matching the existing JSON schema.
     """
@@ -1160,11 +1439,17 @@ def _build_material_entry(material_block, blend_file, warnings):
         "settings": extract_material_settings(material_block, warnings),
     }
     if node_tree:
-        material_entry["node_tree"] = _build_node_tree_entry(node_tree, blend_file, warnings)
+        # Materials can share one node tree (linked/library data); serialize it
+        # once and reuse the same dict, which dumps identically each time.
+        node_tree_entry = node_tree_cache.get(node_tree.addr_old)
+        if node_tree_entry is None:
+            node_tree_entry = _build_node_tree_entry(node_tree, blend_file, warnings, linked_id_cache)
+            node_tree_cache[node_tree.addr_old] = node_tree_entry
+        material_entry["node_tree"] = node_tree_entry
     return material_entry
 
 
-def _build_export_payload(blend_file, blend_path: Path, warnings):
+def _build_export_payload(blend_file, blend_path: Path, warnings, exported_at: str):
     """
     Build the complete export payload for one .blend file.
 
@@ -1176,17 +1461,22 @@ def _build_export_payload(blend_file, blend_path: Path, warnings):
         blend_file: Opened BAT BlendFile.
         blend_path: Source .blend path.
         warnings: Warning sink list shared across extractors.
+        exported_at: ISO-8601 export timestamp, taken once by the caller.
     returns:
         Root JSON payload dict.
     """
+    # Pointers are stable for the whole file, so linked IDs and shared node
+    # trees resolve once per export.
+    linked_id_cache = {}
+    node_tree_cache = {}
     return {
         "schema_version": SCHEMA_VERSION,
         "blender_version": blender_version_string(blend_file),
-        "exported_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "exported_at": exported_at,
         "blend": str(blend_path),
         "warnings": warnings,
         "materials": [
-            _build_material_entry(material_block, blend_file, warnings)
+            _build_material_entry(material_block, blend_file, warnings, linked_id_cache, node_tree_cache)
             for material_block in blend_file.find_blocks_from_code(b"MA")
         ],
     }
@@ -1201,27 +1491,75 @@ def main():
     extraction before translating the data into Godot material properties.
 
     inputs:
-        Uses sys.argv or an interactive prompt for the input path.
-        Optionally accepts an output filename/path as the second CLI argument.
+        Reads the .blend path (or prompts for it), an optional output
+        filename/path (ending in .json.gz for a gzip-compressed snapshot), and
+        the --pretty and --graphs flags from argparse.
     returns:
         None. Writes outputs under Material Outputs/<blend-stem>/ and prints
         generated file paths/status.
     """
-    blend_path = (
-        Path(sys.argv[1])
-        if len(sys.argv) >= 2
-        else Path(input("Path to .blend: ").strip('"'))
+    parser = argparse.ArgumentParser(
+        description="Export Blender materials and node graphs to JSON.",
+    )
+    parser.add_argument(
+        "blend_path",
+        nargs="?",
+        type=Path,
+        default=None,
+        help="Path to the .blend file (prompted for when omitted)",
+    )
+    parser.add_argument(
+        "out",
+        nargs="?",
+        default=None,
+        help=(
+            "Output JSON filename, saved under Material Outputs/<blend-stem>/ "
+            "(default: <blend-stem>.json; use .json.gz to compress)"
+        ),
     )
-    out_arg = sys.argv[2] if len(sys.argv) >= 3 else None
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Write indented JSON instead of the compact default",
+    )
+    parser.add_argument(
+        "--graphs",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Also render node-graph PNGs with plot_node_tree.py (default: off)",
+    )
+    args = parser.parse_args()
+
+    blend_path = args.blend_path or Path(input("Path to .blend: ").strip('"'))
+    pretty = args.pretty
+    out_arg = args.out
     out_path = _resolve_output_json_path(blend_path, out_arg)
 
     blend_file = blendfile.open_cached(blend_path)
     warnings = []
-    export_payload = _build_export_payload(blend_file, blend_path, warnings)
-
-    out_path.write_text(json.dumps(export_payload, indent=2), encoding="utf-8")
+    exported_at = datetime.now().astimezone().isoformat(timespec="seconds")
+    export_payload = _build_export_payload(blend_file, blend_path, warnings, exported_at)
+
+    # Stream the snapshot through a 64KB buffer rather than building the whole
+    # document as one string first; compact separators roughly halve its size
+    # (--pretty restores the indented layout for reading by hand).
+    # A .json.gz name writes it gzip-compressed (level 1: fast, ~5x smaller).
+    if out_path.suffix.lower() == ".gz":
+        import gzip
+
+        out_file = gzip.open(out_path, "wt", compresslevel=1, encoding="utf-8")
+    else:
+        out_file = out_path.open("w", encoding="utf-8", buffering=64 * 1024)
+    with out_file:
+        if pretty:
+            json.dump(export_payload, out_file, indent=2, ensure_ascii=False)
+        else:
+            json.dump(export_payload, out_file, separators=(",", ":"), ensure_ascii=False)
     print(f"Wrote {out_path}")
-    render_graph_exports(out_path, export_payload["materials"], blend_path.stem)
+    # Graph rendering starts matplotlib subprocesses and usually costs far more
+    # than the export itself, so it only runs when asked for.
+    if args.graphs:
+        render_graph_exports(out_path, export_payload["materials"], blend_path.stem)
 
 
 if __name__ == "__main__":